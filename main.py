@@ -1,13 +1,169 @@
-from src.etl.orchestrator import ETLOrchestrator
+"""
+Command line entry point for the Taxi ETL pipeline.
+Only the standard library, the config module and the logger are imported up front; pandas and the
+pipeline modules are imported inside the commands that need them, so quick commands such as
+`validate` start without loading the data stack.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from src.config.settings import Config, get_config
 from src.utils.logger import get_logger
 
-def main():
-    """Main Entry Point for the ETL Process"""
+def _load_config(args):
+    if args.config:
+        return Config(args.config)
+    return get_config()
+
+def _sample_rows(args, config):
+    if args.sample is None:
+        return None
+    return args.sample or config.get('sampling.rows', 10000)
+
+def _stratified(args):
+    if args.sample_method is None:
+        return None
+    return args.sample_method == 'stratified'
+
+def run_command(args):
+    """Runs the full ETL pipeline, or a sampled dry run of it with --sample"""
+    from src.etl.orchestrator import ETLOrchestrator
+
     logger = get_logger(__name__)
+    logger.info("Starting ETL Process")
+    config = _load_config(args)
+    etl = ETLOrchestrator(config)
+    results = etl.run_pipeline(
+        input_path=args.input, sample_rows=_sample_rows(args, config),
+        sample_seed=args.seed, stratified=_stratified(args)
+    )
+    print(json.dumps(results['summary'], indent=2, default=str))
+    return 0
+
+def validate_command(args):
+    """Validates the configuration and checks that the input file exists"""
+    config = _load_config(args)
+    errors = []
+    if not config.validate_required_config():
+        errors.append('gcp configuration is missing')
+    for key, value in (config.get_gcp_config() or {}).items():
+        if value in (None, ''):
+            errors.append(f'gcp.{key} is empty')
+    input_path = args.input or config.get('data.input_path')
+    if not input_path or not os.path.exists(input_path):
+        errors.append(f'input file {input_path} not found')
+
+    if errors:
+        for error in errors:
+            print(f'Invalid: {error}')
+        return 1
+    print(f'Configuration {config.yaml_config_path} is valid')
+    return 0
+
+def profile_command(args):
+    """Profiles the input chunk by chunk with mergeable sketches and prints the report"""
+    from pathlib import Path
+    from src.data.reader import DataReader
+    from src.data.processor import DataProcessor
+
+    config = _load_config(args)
+    input_path = Path(args.input or config.get('data.input_path'))
+    chunks = DataReader().read_csv_chunks(input_path, config.get('data.batch_size', 10000))
+    profile = DataProcessor().profile_chunks(
+        chunks, config.get_validation_config(), ['tpep_pickup_datetime', 'tpep_dropoff_datetime']
+    )
+    print(json.dumps(profile.to_dict(), indent=2, default=str))
+    return 0
+
+def benchmark_command(args):
+    """Runs the pipeline repeatedly and reports the timing of every stage"""
+    from src.etl.orchestrator import ETLOrchestrator
+
+    config = _load_config(args)
+    sample_rows = _sample_rows(args, config)
+    input_path = args.input or config.get('data.input_path' if sample_rows else 'data.sample_path')
+    etl = ETLOrchestrator(config)
+    runs = []
+    for _ in range(args.repeat):
+        run_start = time.perf_counter()
+        results = etl.run_pipeline(
+            input_path=input_path, dry_run=True, sample_rows=sample_rows,
+            sample_seed=args.seed, stratified=_stratified(args)
+        )
+        timings = dict(results['summary']['stage_timings'])
+        timings['total'] = round(time.perf_counter() - run_start, 4)
+        runs.append(timings)
+
+    print(f'Benchmark of {input_path} over {args.repeat} run(s), seconds per stage:')
+    for stage in runs[0]:
+        values = [run[stage] for run in runs]
+        print(f'  {stage:<12} min {min(values):.4f}  avg {sum(values)/len(values):.4f}  max {max(values):.4f}')
+    return 0
+
+def serve_command(args):
+    """Serves cached star-schema aggregates over HTTP until interrupted"""
+    from src.serving.query_service import StarSchemaQueryService
+    from src.serving.server import create_server
+
+    config = _load_config(args)
+    query_service = StarSchemaQueryService(config.get('output.path'), config.get('serving.cache_size', 256))
+    server = create_server(query_service, config.get('serving.host', '127.0.0.1'), args.port or config.get('serving.port', 8050))
+    print(f'Serving {config.get("output.path")} on http://{server.server_address[0]}:{server.server_address[1]}')
     try:
-        logger.info("Starting ETL Process")
-        etl = ETLOrchestrator()
-        results= etl.run_pipeline()
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+def _add_sampling_arguments(parser):
+    parser.add_argument('--sample', type=int, nargs='?', const=0, default=None,
+                        help='dry run on a sample of N rows drawn from the full input (defaults to sampling.rows)')
+    parser.add_argument('--seed', type=int, default=None, help='sampling seed, overrides sampling.seed')
+    parser.add_argument('--sample-method', choices=['random', 'stratified'], default=None,
+                        help='overrides sampling.method')
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='taxi-etl', description='ETL pipeline for NYC taxi data')
+    parser.add_argument('--config', default=None, help='path to config.yaml (defaults to the project root file)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='run the full ETL pipeline')
+    run_parser.add_argument('--input', default=None, help='input CSV, overrides data.input_path')
+    _add_sampling_arguments(run_parser)
+    run_parser.set_defaults(handler=run_command)
+
+    validate_parser = subparsers.add_parser('validate', help='validate the configuration')
+    validate_parser.add_argument('--input', default=None, help='input CSV, overrides data.input_path')
+    validate_parser.set_defaults(handler=validate_command)
+
+    profile_parser = subparsers.add_parser('profile', help='print a constant-memory data profile of the input')
+    profile_parser.add_argument('--input', default=None, help='input CSV, overrides data.input_path')
+    profile_parser.set_defaults(handler=profile_command)
+
+    benchmark_parser = subparsers.add_parser('benchmark', help='time every pipeline stage')
+    benchmark_parser.add_argument('--input', default=None, help='input CSV, defaults to data.sample_path (data.input_path with --sample)')
+    benchmark_parser.add_argument('--repeat', type=int, default=3, help='number of pipeline runs')
+    _add_sampling_arguments(benchmark_parser)
+    benchmark_parser.set_defaults(handler=benchmark_command)
+
+    serve_parser = subparsers.add_parser('serve', help='serve star-schema aggregates over HTTP')
+    serve_parser.add_argument('--port', type=int, default=None, help='overrides serving.port')
+    serve_parser.set_defaults(handler=serve_command)
+    return parser
+
+def main(argv=None):
+    """Main Entry Point for the ETL Process"""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
     except Exception as e:
         print(f"Error: {e}")
-        return
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
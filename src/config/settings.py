@@ -1,22 +1,36 @@
 from dotenv import load_dotenv
+from functools import lru_cache
 from pathlib import Path
 import yaml
 import os
+import re
+
+from ..utils.exceptions import ConfigurationError
+
+ENV_OVERRIDE_PREFIX = 'TAXI_ETL__'
+ENV_PLACEHOLDER_PATTERN = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)(?::-([^}]*))?\}')
+BOOLEAN_VALUES = {'true': True, 'yes': True, 'on': True, '1': True, 'false': False, 'no': False, 'off': False, '0': False}
 
 class Config:
     """
     Centralized configuration management
     Firstly, loads the env variables, loads the YAML file into configs, then overwrites the configs with env variables.
+    Env variables are applied generically: ${VAR} and ${VAR:-default} placeholders in the YAML are substituted (the .env
+    names such as BATCH_SIZE or LOG_LEVEL are wired this way in config.yaml), and any variable named
+    TAXI_ETL__<SECTION>__<KEY> overrides the nested key section.key. Env values are only converted when the
+    value they replace (the placeholder default or the overridden YAML value) is a number, boolean or list,
+    so IDs, paths and credentials such as GCP_DATASET_ID=0123 stay strings.
     Retrieve the YAML config using get method
     """
-    
-    def __init__(self, yaml_config_path):
+
+    def __init__(self, yaml_config_path=None):
         load_dotenv()
         if yaml_config_path is None:
             # if yaml path not given then search in root project folder
             yaml_config_path = Path(__file__).parent.parent.parent / 'config.yaml'
-        
-        self.configs = self._load_yaml_file(yaml_config_path)
+
+        self.yaml_config_path = Path(yaml_config_path)
+        self.configs = self._load_yaml_file(self.yaml_config_path)
         self._override_yaml_config_with_env()
 
     def _load_yaml_file(self, yaml_config_path):
@@ -26,37 +40,90 @@ class Config:
             return configs or {}
         except Exception as e:
             print(f'Error occured during reading YAML file in path {yaml_config_path}: {e}')
+            return {}
 
     def _override_yaml_config_with_env(self):
-        if os.os.environ.get('key1')('key1'):
-            self.configs['key1'] = os.environ.get('key1')
-        if os.environ.get('key2'):
-            self.configs['key2'] = os.environ.get('key2')
-    
-    def get(self, key):
-        keys = key.split('.')
-        for k in keys:
-            value = self.configs[k]
-            return value
-        return {}
+        self.configs = self._resolve_placeholders(self.configs)
+        for env_key, env_value in os.environ.items():
+            if not env_key.startswith(ENV_OVERRIDE_PREFIX):
+                continue
+            keys = [k.lower() for k in env_key[len(ENV_OVERRIDE_PREFIX):].split('__') if k]
+            if not keys:
+                continue
+            section = self.configs
+            for k in keys[:-1]:
+                if not isinstance(section.get(k), dict):
+                    section[k] = {}
+                section = section[k]
+            section[keys[-1]] = self._coerce_env_value(env_value, section.get(keys[-1]), env_key)
+
+    def _resolve_placeholders(self, value):
+        if isinstance(value, dict):
+            return {k: self._resolve_placeholders(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._resolve_placeholders(v) for v in value]
+        if isinstance(value, str):
+            substitute = lambda m: os.environ.get(m.group(1), m.group(2) or '')
+            match = ENV_PLACEHOLDER_PATTERN.fullmatch(value)
+            if match:
+                # a value that is only a placeholder takes the type of its default, e.g. ${BATCH_SIZE:-10000} is an int
+                default = yaml.safe_load(match.group(2)) if match.group(2) else None
+                return self._coerce_env_value(ENV_PLACEHOLDER_PATTERN.sub(substitute, value), default, match.group(1))
+            return ENV_PLACEHOLDER_PATTERN.sub(substitute, value)
+        return value
+
+    @staticmethod
+    def _coerce_env_value(env_value, like, env_key):
+        """Converts an env string to the type of the value it replaces, anything else stays a string"""
+        if env_value == '':
+            return None
+        try:
+            if isinstance(like, bool):
+                return BOOLEAN_VALUES[env_value.strip().lower()]
+            if isinstance(like, int):
+                return int(env_value)
+            if isinstance(like, float):
+                return float(env_value)
+            if isinstance(like, (list, dict)):
+                return yaml.safe_load(env_value)
+        except (KeyError, ValueError, yaml.YAMLError):
+            raise ConfigurationError(f'Invalid value {env_value!r} for {env_key}, expected {type(like).__name__}')
+        return env_value
+
+    def get(self, key, default=None):
+        value = self.configs
+        for k in key.split('.'):
+            if not isinstance(value, dict) or k not in value:
+                return default
+            value = value[k]
+        return value
 
     def get_gcp_config(self):
         return self.configs.get('gcp')
 
     def get_data_config(self):
         return self.configs.get('data')
-    
+
     def get_logging_config(self):
         return self.configs.get('logging')
-    
+
+    def get_validation_config(self):
+        return self.configs.get('validation', {})
+
     def validate_required_config(self):
         if self.get_gcp_config():
             return True
         return False
-        
-# Configuration instance
-config = Config()
 
 
-        
+@lru_cache(maxsize=None)
+def get_config(yaml_config_path=None):
+    """Configuration instance, created on first use instead of at import time"""
+    return Config(yaml_config_path)
+
 
+def __getattr__(name):
+    # keeps `from src.config.settings import config` working without loading .env/YAML at import time
+    if name == 'config':
+        return get_config()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
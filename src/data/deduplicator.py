@@ -0,0 +1,237 @@
+"""
+Duplicate trip detection for Taxi ETL V2 project.
+Trips are identified by a 64-bit hash of their natural key and checked against a disk-backed
+Bloom filter that persists between runs, so memory stays bounded at any history size; only the
+hashes of the current run are held in memory (8 bytes per trip).
+"""
+import json
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..utils.exceptions import DeduplicationError
+from ..utils.logger import get_logger
+
+DEFAULT_KEY_COLUMNS = [
+    'VendorID', 'tpep_pickup_datetime', 'tpep_dropoff_datetime',
+    'pickup_longitude', 'pickup_latitude', 'dropoff_longitude', 'dropoff_latitude',
+    'fare_amount', 'tip_amount', 'total_amount'
+]
+
+class DiskBloomFilter:
+    """Bloom filter whose bit array is a memory-mapped file, paged in by the OS as needed"""
+
+    def __init__(self, path, expected_items, false_positive_rate, read_only=False):
+        self.path = Path(path)
+        self.meta_path = self.path.with_suffix(self.path.suffix + '.json')
+        self.read_only = read_only
+        if self.path.exists() and self.meta_path.exists():
+            with open(self.meta_path, 'r') as f:
+                meta = json.load(f)
+        elif read_only:
+            raise FileNotFoundError(f'Bloom filter {self.path} does not exist')
+        else:
+            num_bits = int(math.ceil(-expected_items * math.log(false_positive_rate) / math.log(2) ** 2))
+            num_bits = int(math.ceil(num_bits / 8) * 8)
+            meta = {
+                'num_bits': num_bits,
+                'num_hashes': max(1, int(round(num_bits / expected_items * math.log(2)))),
+                'expected_items': expected_items,
+                'false_positive_rate': false_positive_rate,
+                'items_added': 0
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'wb') as f:
+                f.truncate(num_bits // 8)
+        self.num_bits = meta['num_bits']
+        self.num_hashes = meta['num_hashes']
+        # the size the filter was built for, the stored metadata wins over a changed configuration
+        self.expected_items = meta['expected_items']
+        self.false_positive_rate = meta['false_positive_rate']
+        self.items_added = meta['items_added']
+        self.bits = np.memmap(self.path, dtype=np.uint8, mode='r' if read_only else 'r+', shape=(self.num_bits // 8,))
+
+    def estimated_false_positive_rate(self, items=None):
+        items = self.items_added if items is None else items
+        return (1 - math.exp(-self.num_hashes * items / self.num_bits)) ** self.num_hashes
+
+    def _positions(self, hashes):
+        # double hashing: position_i = h1 + i*h2 (mod num_bits)
+        h1 = (hashes & np.uint64(0xFFFFFFFF)).astype(np.uint64)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rounds = np.arange(self.num_hashes, dtype=np.uint64)
+        return (h1[:, None] + rounds[None, :] * h2[:, None]) % np.uint64(self.num_bits)
+
+    def contains(self, hashes):
+        if len(hashes) == 0:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(hashes)
+        bytes_ = self.bits[(positions >> np.uint64(3)).astype(np.int64)]
+        masks = (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8))
+        return np.all(bytes_ & masks, axis=1)
+
+    def add(self, hashes):
+        if len(hashes) == 0:
+            return
+        positions = self._positions(hashes).ravel()
+        masks = (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8))
+        np.bitwise_or.at(self.bits, (positions >> np.uint64(3)).astype(np.int64), masks)
+        self.items_added += len(hashes)
+
+    def flush(self):
+        if self.read_only:
+            return
+        self.bits.flush()
+        tmp_meta_path = self.meta_path.with_suffix('.json.tmp')
+        with open(tmp_meta_path, 'w') as f:
+            json.dump({
+                'num_bits': self.num_bits, 'num_hashes': self.num_hashes, 'expected_items': self.expected_items,
+                'false_positive_rate': self.false_positive_rate, 'items_added': self.items_added
+            }, f)
+        os.replace(tmp_meta_path, self.meta_path)
+
+    def close(self):
+        self.flush()
+        del self.bits
+
+class SortedHashSet:
+    """Exact set of 64-bit hashes stored as sorted runs, a run is merged into the previous one once it is as large"""
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            positions = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            found |= run[positions] == hashes
+        return found
+
+    def add(self, hashes):
+        run = np.unique(hashes)
+        # geometric merging keeps O(log n) runs and amortized O(n log n) work
+        while self.runs and len(self.runs[-1]) <= len(run):
+            run = np.union1d(self.runs.pop(), run)
+        if len(run):
+            self.runs.append(run)
+
+    def values(self):
+        return np.concatenate(self.runs) if self.runs else np.empty(0, dtype=np.uint64)
+
+class TripDeduplicator:
+    """
+    Drops trips whose natural key was already seen in this run or a previous one.
+    The persisted filter is only read during the run, as a snapshot of the history before it. Trips of this run
+    are tracked exactly in memory and added to the persisted filter on commit(), so a failed or dry run does not
+    mark its trips as seen. With check_history=False only repeats within the run are dropped.
+    """
+
+    def __init__(self, state_path, expected_trips=200_000_000, false_positive_rate=1e-4, key_columns=None, check_history=True):
+        self.logger = get_logger(__name__)
+        self.state_path = Path(state_path)
+        self.expected_trips = expected_trips
+        self.false_positive_rate = false_positive_rate
+        self.key_columns = key_columns or DEFAULT_KEY_COLUMNS
+        self.check_history = check_history
+        self.history = None
+        self.run_hashes = None
+        self.stats = {'rows_checked': 0, 'duplicates_in_run': 0, 'duplicates_from_history': 0, 'history_checked': check_history}
+
+    def _open(self):
+        if self.run_hashes is not None:
+            return
+        try:
+            self.run_hashes = SortedHashSet()
+            meta_path = self.state_path.with_suffix(self.state_path.suffix + '.json')
+            if self.check_history and self.state_path.exists() and meta_path.exists():
+                self.history = DiskBloomFilter(self.state_path, self.expected_trips, self.false_positive_rate, read_only=True)
+                self.logger.info(f'Opened trip filter {self.state_path} with {self.history.items_added} historical trips')
+                self._check_capacity(self.history)
+        except Exception as e:
+            error_msg = f'Error opening trip filter {self.state_path}: {e}'
+            self.logger.error(error_msg)
+            raise DeduplicationError(error_msg)
+
+    def hash_trips(self, df) -> np.ndarray:
+        missing_columns = [col for col in self.key_columns if col not in df.columns]
+        if missing_columns:
+            raise DeduplicationError(f'Missing natural key columns for deduplication: {missing_columns}')
+        key = pd.DataFrame(index=df.index)
+        for col in self.key_columns:
+            # normalize dtypes so the same trip hashes identically regardless of chunk-level type inference
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                key[col] = df[col].astype('datetime64[ns]').to_numpy().view(np.int64)
+            else:
+                key[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+        return pd.util.hash_pandas_object(key, index=False).to_numpy(dtype=np.uint64)
+
+    def drop_duplicates(self, df):
+        self.logger.debug(f'Executing function {self.drop_duplicates.__name__}...')
+        self._open()
+        try:
+            hashes = self.hash_trips(df)
+            seen_before = self.history.contains(hashes) if self.history is not None else np.zeros(len(hashes), dtype=bool)
+            repeated_in_run = self.run_hashes.contains(hashes) | pd.Series(hashes).duplicated().to_numpy()
+            keep = ~(seen_before | repeated_in_run)
+            self.run_hashes.add(hashes[keep])
+
+            self.stats['rows_checked'] += len(df)
+            self.stats['duplicates_from_history'] += int(seen_before.sum())
+            self.stats['duplicates_in_run'] += int((repeated_in_run & ~seen_before).sum())
+            dropped = len(df) - int(keep.sum())
+            if dropped:
+                self.logger.warning(f'Dropped {dropped} duplicate trips out of {len(df)}')
+            return df[keep].reset_index(drop=True)
+        except DeduplicationError:
+            raise
+        except Exception as e:
+            error_msg = f'Error during duplicate detection: {e}'
+            self.logger.error(error_msg)
+            raise DeduplicationError(error_msg)
+
+    def _check_capacity(self, bloom):
+        """Warns when new trips start to be dropped as history more often than the filter was sized for"""
+        if (bloom.expected_items, bloom.false_positive_rate) != (self.expected_trips, self.false_positive_rate):
+            self.logger.warning(
+                f'Trip filter {self.state_path} was built for {bloom.expected_items} trips at a false positive rate of '
+                f'{bloom.false_positive_rate}, the configured {self.expected_trips} trips at {self.false_positive_rate} '
+                f'only apply to a new filter: move the state file away to rebuild it'
+            )
+        if bloom.items_added > bloom.expected_items:
+            self.logger.warning(
+                f'Trip filter {self.state_path} holds {bloom.items_added} trips, over its capacity of {bloom.expected_items}: '
+                f'about {bloom.estimated_false_positive_rate():.2%} of new trips are dropped as duplicates_from_history'
+            )
+
+    def _close_history(self):
+        if self.history is not None:
+            self.history.close()
+            self.history = None
+
+    def commit(self):
+        """Persists the trips seen in this run"""
+        if self.run_hashes is None:
+            return
+        self._close_history()
+        try:
+            bloom = DiskBloomFilter(self.state_path, self.expected_trips, self.false_positive_rate)
+            bloom.add(self.run_hashes.values())
+            bloom.close()
+            self._check_capacity(bloom)
+        except Exception as e:
+            error_msg = f'Error updating trip filter {self.state_path}: {e}'
+            self.logger.error(error_msg)
+            raise DeduplicationError(error_msg)
+        self.logger.info(f'Trip filter {self.state_path} updated with {len(self.run_hashes)} trips: {self.stats}')
+        self.run_hashes = None
+
+    def rollback(self):
+        """Discards the trips seen in this run"""
+        self._close_history()
+        self.run_hashes = None
@@ -4,12 +4,24 @@ Handles data transformations, type conversions, and memory optimization.
 """
 import pandas as pd
 
+from .statistics import DataProfile, HyperLogLog, RULE_COLUMNS
 from ..utils.exceptions import MemoryOptimizationError
 from ..utils.logger import get_logger
 
+# validation rule -> warning, formatted with the number of violating trips and the rule threshold
+RULE_WARNINGS = {
+    'min_passenger_count': 'Found {count} trips with passenger count < {threshold}',
+    'max_passenger_count': 'Found {count} trips with passenger_count > {threshold}',
+    'min_trip_distance': 'Found {count} trips with distance < {threshold}',
+    'max_trip_distance': 'Found {count} trips with distance > {threshold}',
+    'min_fare_amount': 'Found {count} trips with fare < {threshold}',
+}
+CRITICAL_COLUMNS = ['VendorID', 'tpep_pickup_datetime', 'tpep_dropoff_datetime']
+
 class DataProcessor:
     def __init__(self):
         self.logger = get_logger(__name__)
+        self.last_memory_usage = None
 
     def convert_datetime_columns(self, df, columns,errors='coerce'):
         self.logger.info(f'Executing function {self.convert_datetime_columns.__name__}....')
@@ -37,7 +49,8 @@ class DataProcessor:
         print(f'Executing function {self.optimize_data_types.__name__}...')
         try:
             df_copy = df.copy()
-            memory_before = df_copy.memory_usage(deep=True, index=False).sum()/1024/1024
+            bytes_before = df_copy.memory_usage(deep=True, index=False).sum()
+            memory_before = bytes_before/1024/1024
             self.logger.info(f'Initial memory usage: {memory_before:.2f} MB')
             type_changes = []
             for col in df_copy.columns:
@@ -63,9 +76,12 @@ class DataProcessor:
                 except Exception as e:
                     self.logger.warning(f'Could not optimize column {col}: {e}')
             
-            memory_after = df_copy.memory_usage(deep=True, index=False).sum()/1024/1024
-            reduction = ((memory_before - memory_after)/memory_before)*100'
-            self.logger.info('Memory Usage after Optimization: {memory_after:.2f} MB, reduction of {reduction:.2f}%')
+            bytes_after = df_copy.memory_usage(deep=True, index=False).sum()
+            memory_after = bytes_after/1024/1024
+            # kept so callers (e.g. the memory governor) can reuse the figures without recomputing them
+            self.last_memory_usage = {'rows': len(df_copy), 'bytes_before': int(bytes_before), 'bytes_after': int(bytes_after)}
+            reduction = ((memory_before - memory_after)/memory_before)*100
+            self.logger.info(f'Memory Usage after Optimization: {memory_after:.2f} MB, reduction of {reduction:.2f}%')
             self.logger.info(f'Type changes: {len(type_changes)} columns optimized')
             self.logger.debug(f'Completed executing function {self.optimize_data_types.__name__}')
             return df_copy
@@ -76,7 +92,8 @@ class DataProcessor:
             raise MemoryOptimizationError(error_msg)
         
     def _optimize_object_column(self, series: pd.Series):
-        if series.nunique() / len(series) < 0.05:
+        # approximate distinct count with a fixed-size sketch instead of materializing the unique values
+        if HyperLogLog().update(series).count() / len(series) < 0.05:
             return series.astype('category')
         try:
             numeric_series = pd.to_numeric(series, errors='coerce')
@@ -94,7 +111,7 @@ class DataProcessor:
 
         return series
     
-    def validate_data_quality(self, df, validation_rules):
+    def validate_data_quality(self, df, validation_rules, profile=None):
         validation_results = {
             'passed': True,
             'errors': [],
@@ -102,59 +119,33 @@ class DataProcessor:
             'summary': {}
         }
         try:
-            if 'min_passenger_count' in validation_rules:
-                min_passengers = validation_rules['min_passenger_count']
-                invalid_passengers = df[df['passenger_count'] < min_passengers]
-                if len(invalid_passengers) > 0:
-                    validation_results['warnings'].append(f'Found {len(invalid_passengers)} trips with passenger count < {min_passengers}')
-            
-            if 'max_passenger_count' in validation_rules:
-                max_passengers = validation_rules['max_passenger_count']
-                invalid_passengers = df[df['passenger_count'] > max_passengers]
-                if len(invalid_passengers) > 0:
-                    validation_results['warnings'].append(
-                        f"Found {len(invalid_passengers)} trips with passenger_count > {max_passengers}"
-                    )
-
-            if 'min_trip_distance' in validation_rules:
-                min_distance = validation_rules['min_trip_distance']
-                invalid_distance = df[df['trip_distance'] < min_distance]
-                if len(invalid_distance) > 0:
-                    validation_results['warnings'].append(
-                        f"Found {len(invalid_distance)} trips with distance < {min_distance}"
-                    )
-
-            if 'max_trip_distance' in validation_rules:
-                max_distance = validation_rules['max_trip_distance']
-                invalid_distance = df[df['trip_distance'] > max_distance]
-                if len(invalid_distance) > 0:
-                    validation_results['warnings'].append(
-                        f"Found {len(invalid_distance)} trips with distance > {max_distance}"
-                    )
-            
-            if 'min_fare_amount' in validation_rules:
-                min_fare = validation_rules['min_fare_amount']
-                invalid_fare = df[df['fare_amount'] < min_fare]
-                if len(invalid_fare) > 0:
-                    validation_results['warnings'].append(
-                        f"Found {len(invalid_fare)} trips with fare < {min_fare}"
-                    )
-            
-            critical_columns = ['VendorID', 'tpep_pickup_datetime', 'tpep_dropoff_datetime']
-            for col in critical_columns:
-                if col in df.columns:
-                    null_count = df[col].isnull().sum()
-                    if null_count > 0:
-                        validation_results['warnings'].append(
-                            f"Column {col} has {null_count} null values"
-                        )
-
-            validation_results['summary'] = {
-                'total_rows': len(df),
-                'total_columns': len(df.columns),
-                'memory_usage_mb': df.memory_usage(deep=True).sum() / 1024 / 1024,
-                'null_counts': df.isnull().sum().to_dict()
-            }
+            if profile is not None:
+                # counts merged from the per-chunk profiles, the frame is not scanned again
+                violation_counts = profile.violation_counts
+                null_counts = {col: profile.null_counts.get(col, 0) for col in CRITICAL_COLUMNS if col in profile.columns}
+                validation_results['summary'] = profile.to_dict()
+            else:
+                violation_counts = {}
+                for rule in RULE_WARNINGS:
+                    if rule in validation_rules:
+                        col, comparison = RULE_COLUMNS[rule]
+                        threshold = validation_rules[rule]
+                        violations = df[col] < threshold if comparison == 'lt' else df[col] > threshold
+                        violation_counts[rule] = int(violations.sum())
+                null_counts = {col: int(df[col].isnull().sum()) for col in CRITICAL_COLUMNS if col in df.columns}
+                validation_results['summary'] = {
+                    'total_rows': len(df),
+                    'total_columns': len(df.columns),
+                    'memory_usage_mb': df.memory_usage(deep=True).sum() / 1024 / 1024,
+                    'null_counts': df.isnull().sum().to_dict()
+                }
+
+            for rule, warning in RULE_WARNINGS.items():
+                if rule in validation_rules and violation_counts.get(rule, 0) > 0:
+                    validation_results['warnings'].append(warning.format(count=violation_counts[rule], threshold=validation_rules[rule]))
+            for col, null_count in null_counts.items():
+                if null_count > 0:
+                    validation_results['warnings'].append(f"Column {col} has {null_count} null values")
 
         except Exception as e:
             validation_results['passed'] = False
@@ -163,9 +154,13 @@ class DataProcessor:
 
         return validation_results
 
-        
-
-            
-
-
-
+    def profile_chunks(self, chunks, validation_rules=None, datetime_columns=None):
+        """Builds a DataProfile chunk by chunk, so memory stays constant at any input size"""
+        profile = DataProfile(validation_rules)
+        for chunk in chunks:
+            for col in datetime_columns or []:
+                if col in chunk.columns:
+                    chunk[col] = pd.to_datetime(chunk[col], errors='coerce')
+            profile.update(chunk)
+        self.logger.info(f'Profiled {profile.row_count} rows in {profile.chunk_count} chunks')
+        return profile
@@ -1,6 +1,10 @@
 """
 Data reading utilities for Taxi ETL V2 project.
 """
+import heapq
+import io
+import math
+import random
 import pandas as pd
 from pathlib import Path
 from typing import Optional
@@ -8,6 +12,11 @@ from typing import Optional
 from ..utils.exceptions import FileOperationError, DataValidationError
 from ..utils.logger import get_logger
 
+# strata derived from a raw field value without parsing the whole row
+DERIVED_STRATA = {
+    'pickup_month': ('tpep_pickup_datetime', lambda value: value[:7]),
+}
+
 class DataReader:
     def __init__(self):
         self.logger = get_logger(__name__)
@@ -32,7 +41,7 @@ class DataReader:
         if missing_columns:
             error_msg = f'Missing required columns in df: {missing_columns}'
             self.logger.error(error_msg)
-            raise DataValidationError
+            raise DataValidationError(error_msg, missing_columns)
         self.logger.debug(f'Column Validation passed, all required columns present.')
 
     def get_file_info(self, file_path: Path):
@@ -56,4 +65,141 @@ class DataReader:
         except Exception as e:
             error_msg = f"Error creating chunked reader for {file_path}: {e}"
             self.logger.error(error_msg)
-            raise FileOperationError(error_msg)
\ No newline at end of file
+            raise FileOperationError(error_msg)
+
+    def iter_csv_chunks(self, file_path, chunk_rows, required_columns: Optional[list]=None):
+        """Yields chunks whose size is asked from chunk_rows() before every read, so it can change during the run"""
+        try:
+            if not Path(file_path).exists():
+                raise FileOperationError(f'File {file_path} not found!')
+            reader = pd.read_csv(file_path, iterator=True)
+        except Exception as e:
+            error_msg = f"Error creating chunked reader for {file_path}: {e}"
+            self.logger.error(error_msg)
+            raise FileOperationError(error_msg)
+        with reader:
+            first_chunk = True
+            while True:
+                try:
+                    chunk = reader.get_chunk(chunk_rows())
+                except StopIteration:
+                    break
+                if first_chunk and required_columns:
+                    self._validate_columns(chunk, required_columns)
+                first_chunk = False
+                yield chunk
+
+    def sample_csv(self, file_path, sample_rows, seed=42, strata=None, lines_per_seek=1, oversample=4, required_columns: Optional[list]=None):
+        """
+        Draws a reproducible sample without parsing the whole file: streams about sample_rows * oversample candidate
+        lines read at random seek positions through a bounded reservoir per stratum (e.g. VendorID and pickup_month),
+        then allocates the sample proportionally to the stratum totals estimated from the candidates.
+        Stratum values are taken by splitting on commas, which holds for the unquoted TLC files.
+        """
+        self.logger.debug(f'Executing function {self.sample_csv.__name__}...')
+        try:
+            file_path = Path(file_path)
+            if not file_path.exists():
+                raise FileOperationError(f'File {file_path} not found!')
+            rng = random.Random(seed)
+            reservoirs, stratum_counts = {}, {}
+            with open(file_path, 'rb') as f:
+                header = f.readline()
+                columns = header.decode('utf-8').strip().split(',')
+                stratum_of = self._stratum_function(columns, strata or [])
+                for offset, line in self._candidate_lines(f, sample_rows, rng, lines_per_seek, oversample):
+                    key = stratum_of(line)
+                    stratum_counts[key] = stratum_counts.get(key, 0) + 1
+                    # bottom-k reservoir: the sample_rows candidates with the smallest random priority are a uniform
+                    # sample of the stratum, and no stratum can be allocated more than sample_rows
+                    reservoir = reservoirs.setdefault(key, [])
+                    item = (-rng.random(), offset, line)
+                    if len(reservoir) < sample_rows:
+                        heapq.heappush(reservoir, item)
+                    elif item > reservoir[0]:
+                        heapq.heapreplace(reservoir, item)
+
+            sampled = []
+            for key, allocation in self._allocate(sample_rows, stratum_counts).items():
+                sampled.extend((offset, line) for _, offset, line in sorted(reservoirs[key], reverse=True)[:allocation])
+            sampled.sort()
+
+            df = pd.read_csv(io.BytesIO(header + b''.join(line for _, line in sampled)))
+            if required_columns:
+                self._validate_columns(df, required_columns)
+            self.logger.info(f'Sampled {len(df)} rows from {sum(stratum_counts.values())} candidate lines in {len(reservoirs)} strata of {file_path}')
+            return df
+        except FileOperationError:
+            raise
+        except Exception as e:
+            error_msg = f'Error occured during sampling file {file_path}: {e}'
+            self.logger.error(error_msg)
+            raise FileOperationError(error_msg)
+
+    @staticmethod
+    def _allocate(sample_rows, stratum_counts):
+        """Proportional allocation with largest remainders, so the strata add up to exactly sample_rows"""
+        total = sum(stratum_counts.values())
+        if total <= sample_rows:
+            return dict(stratum_counts)
+        shares = {key: sample_rows * count / total for key, count in stratum_counts.items()}
+        allocation = {key: math.floor(share) for key, share in shares.items()}
+        by_remainder = sorted(shares, key=lambda key: (allocation[key] - shares[key], str(key)))
+        for key in by_remainder[:sample_rows - sum(allocation.values())]:
+            allocation[key] += 1
+        return allocation
+
+    def _candidate_lines(self, f, sample_rows, rng, lines_per_seek, oversample):
+        """
+        Yields (offset, line) for the lines following random seek positions, or for every line of a small file.
+        Short reads per seek keep candidates close to a uniform sample even when the file is sorted (e.g. by month);
+        a line is picked with probability proportional to the length of the line before it, near uniform for TLC rows.
+        """
+        data_start = f.tell()
+        f.seek(0, 2)
+        data_end = f.tell()
+        f.seek(data_start)
+        head = f.read(65536)
+        average_line_bytes = max(len(head) / max(head.count(b'\n'), 1), 1)
+        seeks = math.ceil(sample_rows * oversample / lines_per_seek)
+
+        if seeks * lines_per_seek >= (data_end - data_start) / average_line_bytes:
+            f.seek(data_start)
+            offset = data_start
+            for line in f:
+                if line.strip():
+                    yield offset, line if line.endswith(b'\n') else line + b'\n'
+                offset += len(line)
+            return
+
+        seen_offsets = set()
+        # sorted positions turn the seeks into one forward pass over the file
+        for position in sorted(rng.randrange(data_start, data_end) for _ in range(seeks)):
+            # reading on from the byte before the position lands on the first line starting at or after it
+            f.seek(position - 1)
+            f.readline()
+            for _ in range(lines_per_seek):
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                if offset in seen_offsets or not line.strip():
+                    continue
+                seen_offsets.add(offset)
+                yield offset, line if line.endswith(b'\n') else line + b'\n'
+
+    def _stratum_function(self, columns, strata):
+        extractors = []
+        for stratum in strata:
+            source, transform = DERIVED_STRATA.get(stratum, (stratum, lambda value: value))
+            if source not in columns:
+                raise DataValidationError(f'Unknown sampling stratum {stratum}')
+            extractors.append((columns.index(source), transform))
+        if not extractors:
+            return lambda line: ()
+        max_split = max(index for index, _ in extractors) + 1
+
+        def stratum_of(line):
+            fields = line.decode('utf-8', errors='replace').split(',', max_split)
+            return tuple(transform(fields[index]) if index < len(fields) else None for index, transform in extractors)
+        return stratum_of
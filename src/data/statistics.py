@@ -0,0 +1,224 @@
+"""
+Mergeable streaming statistics for Taxi ETL V2 project.
+Sketches are updated chunk by chunk and can be merged across chunks or worker processes,
+so profiling runs in constant memory regardless of the input size.
+"""
+import math
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+QUANTILE_COLUMNS = ['fare_amount', 'trip_distance', 'trip_duration_minutes']
+# low-cardinality source columns of the dimensions, cheap enough to sketch on the pipeline path
+DIMENSION_CARDINALITY_COLUMNS = ['VendorID', 'RatecodeID', 'payment_type', 'store_and_fwd_flag', 'passenger_count']
+
+# validation rule -> (column, comparison)
+RULE_COLUMNS = {
+    'min_passenger_count': ('passenger_count', 'lt'),
+    'max_passenger_count': ('passenger_count', 'gt'),
+    'min_trip_distance': ('trip_distance', 'lt'),
+    'max_trip_distance': ('trip_distance', 'gt'),
+    'min_fare_amount': ('fare_amount', 'lt'),
+    'max_fare_amount': ('fare_amount', 'gt'),
+}
+
+class HyperLogLog:
+    """Cardinality estimate with a relative error of about 1.04/sqrt(2**precision)"""
+
+    def __init__(self, precision=14):
+        if not 4 <= precision <= 18:
+            raise ValueError(f'HyperLogLog precision must be between 4 and 18, got {precision}')
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, series: pd.Series):
+        series = series.dropna()
+        if series.empty:
+            return self
+        hashes = pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        # frexp gives the bit length exactly since the remainder fits in the float64 mantissa
+        _, bit_length = np.frexp(remainder.astype(np.float64))
+        rank = (64 - self.precision - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other: 'HyperLogLog'):
+        if other.precision != self.precision:
+            raise ValueError('Cannot merge HyperLogLog sketches with different precision')
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+class KLLSketch:
+    """Quantile sketch (Karnin, Lang, Liberty) holding O(k) items per level"""
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.compactors = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.count += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: 'KLLSketch'):
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self):
+        while sum(len(items) for items in self.compactors) > sum(self._capacity(level) for level in range(len(self.compactors))):
+            for level, items in enumerate(self.compactors):
+                if len(items) < self._capacity(level):
+                    continue
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0))
+                items = np.sort(items)
+                kept = items[-1:] if len(items) % 2 else items[:0]
+                paired = items[:len(items) - len(kept)]
+                promoted = paired[self._rng.integers(2)::2]
+                self.compactors[level] = kept
+                self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], promoted])
+                break
+
+    def quantiles(self, qs):
+        if self.count == 0:
+            return [None for _ in qs]
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate([np.full(len(c), 2 ** level, dtype=np.float64) for level, c in enumerate(self.compactors)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        results = []
+        for q in qs:
+            if q <= 0:
+                results.append(self.min)
+            elif q >= 1:
+                results.append(self.max)
+            else:
+                position = min(np.searchsorted(cumulative, q * cumulative[-1]), len(items) - 1)
+                results.append(float(items[position]))
+        return results
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+class DataProfile:
+    """Per-run profile built from chunks: row/null/violation counters, cardinality and quantile sketches"""
+
+    def __init__(self, validation_rules=None, quantile_columns=None, cardinality_columns=None, hll_precision=14, kll_k=200, seed=None):
+        self.validation_rules = {k: v for k, v in (validation_rules or {}).items() if k in RULE_COLUMNS}
+        self.quantile_columns = quantile_columns or QUANTILE_COLUMNS
+        # None sketches every column
+        self.cardinality_columns = cardinality_columns
+        self.hll_precision = hll_precision
+        self.kll_k = kll_k
+        self.seed = seed
+        self.row_count = 0
+        self.chunk_count = 0
+        self.memory_bytes = 0
+        self.peak_chunk_bytes = 0
+        self.columns = []
+        self.null_counts = Counter()
+        self.violation_counts = Counter()
+        self.cardinality = {}
+        self.quantile_sketches = {}
+
+    def update(self, df: pd.DataFrame):
+        chunk_bytes = int(df.memory_usage(deep=True).sum())
+        self.row_count += len(df)
+        self.chunk_count += 1
+        self.memory_bytes += chunk_bytes
+        self.peak_chunk_bytes = max(self.peak_chunk_bytes, chunk_bytes)
+        for col in df.columns:
+            if col not in self.columns:
+                self.columns.append(col)
+        self.null_counts.update({col: int(count) for col, count in df.isnull().sum().items()})
+
+        for rule, threshold in self.validation_rules.items():
+            col, comparison = RULE_COLUMNS[rule]
+            if col in df.columns:
+                violations = df[col] < threshold if comparison == 'lt' else df[col] > threshold
+                self.violation_counts[rule] += int(violations.sum())
+
+        for col in df.columns if self.cardinality_columns is None else self.cardinality_columns:
+            if col in df.columns:
+                self.cardinality.setdefault(col, HyperLogLog(self.hll_precision)).update(df[col])
+
+        for col in self.quantile_columns:
+            values = self._quantile_values(df, col)
+            if values is not None:
+                self.quantile_sketches.setdefault(col, KLLSketch(self.kll_k, self.seed)).update(values)
+        return self
+
+    def _quantile_values(self, df, col):
+        if col in df.columns:
+            return pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        if col == 'trip_duration_minutes' and {'tpep_pickup_datetime', 'tpep_dropoff_datetime'} <= set(df.columns):
+            if pd.api.types.is_datetime64_any_dtype(df['tpep_pickup_datetime']) and pd.api.types.is_datetime64_any_dtype(df['tpep_dropoff_datetime']):
+                duration = (df['tpep_dropoff_datetime'] - df['tpep_pickup_datetime']).dt.total_seconds() / 60
+                return duration.to_numpy(dtype=np.float64, na_value=np.nan)
+        return None
+
+    def merge(self, other: 'DataProfile'):
+        self.row_count += other.row_count
+        self.chunk_count += other.chunk_count
+        self.memory_bytes += other.memory_bytes
+        self.peak_chunk_bytes = max(self.peak_chunk_bytes, other.peak_chunk_bytes)
+        for col in other.columns:
+            if col not in self.columns:
+                self.columns.append(col)
+        self.null_counts.update(other.null_counts)
+        self.violation_counts.update(other.violation_counts)
+        for col, sketch in other.cardinality.items():
+            self.cardinality.setdefault(col, HyperLogLog(sketch.precision)).merge(sketch)
+        for col, sketch in other.quantile_sketches.items():
+            self.quantile_sketches.setdefault(col, KLLSketch(sketch.k, self.seed)).merge(sketch)
+        return self
+
+    def to_dict(self, quantiles=(0.01, 0.25, 0.5, 0.75, 0.99)):
+        return {
+            'total_rows': self.row_count,
+            'total_columns': len(self.columns),
+            'chunks': self.chunk_count,
+            'memory_usage_mb': self.memory_bytes / 1024 / 1024,
+            'peak_chunk_memory_mb': self.peak_chunk_bytes / 1024 / 1024,
+            'null_counts': {col: self.null_counts.get(col, 0) for col in self.columns},
+            'violation_counts': dict(self.violation_counts),
+            'approx_distinct': {col: sketch.count() for col, sketch in self.cardinality.items()},
+            'quantiles': {
+                col: dict(zip([str(q) for q in quantiles], sketch.quantiles(quantiles)))
+                for col, sketch in self.quantile_sketches.items()
+            }
+        }
@@ -0,0 +1,120 @@
+"""
+Data writing utilities for Taxi ETL V2 project.
+Writes the star schema locally as parquet: dimensions as single files and fact_trips partitioned by
+pickup month, with min/max zone maps per fact file recorded in a manifest for query pruning.
+Runs are appended: each run is a segment with its own directory, dimensions and fact files, and the
+manifest lists every published segment, so trips dropped as already ingested stay queryable.
+Fact files also carry the pickup datetime and pickup location type, so the query service can filter
+and group by them without loading the per-trip dimensions of every segment.
+"""
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+from ..utils.exceptions import FileOperationError
+from ..utils.logger import get_logger
+
+MANIFEST_FILE = '_manifest.json'
+ZONE_MAP_COLUMNS = [
+    'dim_vendor_key', 'dim_payment_type_key', 'dim_pickup_location_key', 'dim_dropoff_location_key',
+    'dim_ratecode_key', 'pickup_datetime_key'
+]
+
+class StarSchemaWriter:
+    def __init__(self, output_path, rows_per_file=1_000_000):
+        self.logger = get_logger(__name__)
+        self.output_path = Path(output_path)
+        self.rows_per_file = rows_per_file
+
+    def write(self, dimensions, fact_trips, run_id=None):
+        """Writes a run to its own directory and then atomically appends it to the manifest as a new segment"""
+        self.logger.debug(f'Executing function {self.write.__name__}...')
+        if len(fact_trips) == 0:
+            self.logger.warning(f'No fact rows to write, nothing published to {self.output_path}')
+            return None
+        run_id = run_id or f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        run_dir = self.output_path / 'runs' / run_id
+        try:
+            (run_dir / 'dimensions').mkdir(parents=True, exist_ok=True)
+            for name, dim_df in dimensions.items():
+                dim_df.to_parquet(run_dir / 'dimensions' / f'{name}.parquet', index=False)
+
+            fact_files = self._write_fact_partitions(run_dir, fact_trips, dimensions)
+            segment = {
+                'run_id': run_id,
+                'run_dir': str(run_dir.relative_to(self.output_path)),
+                'completed_at': time.time(),
+                'dimensions': sorted(dimensions),
+                'fact_rows': len(fact_trips),
+                'fact_files': fact_files
+            }
+            segments = read_manifest(self.output_path)['segments'] + [segment]
+            manifest = {
+                'run_id': run_id,
+                'fact_rows': sum(seg['fact_rows'] for seg in segments),
+                'segments': segments
+            }
+            manifest_tmp = self.output_path / f'{MANIFEST_FILE}.tmp'
+            with open(manifest_tmp, 'w') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(manifest_tmp, self.output_path / MANIFEST_FILE)
+
+            self.logger.info(f'Star schema run {run_id} appended as segment {len(segments)}: {len(fact_files)} fact files, {len(dimensions)} dimensions')
+            return manifest
+
+        except Exception as e:
+            shutil.rmtree(run_dir, ignore_errors=True)
+            error_msg = f'Error writing star schema to {self.output_path}: {e}'
+            self.logger.error(error_msg)
+            raise FileOperationError(error_msg)
+
+    def _write_fact_partitions(self, run_dir, fact_trips, dimensions):
+        pickup_datetime = fact_trips['pickup_datetime_key'].map(
+            dimensions['dim_datetime'].set_index('dim_datetime_key')['full_datetime']
+        )
+        # sorting by pickup time keeps the zone maps of each file tight
+        order = pickup_datetime.sort_values(na_position='last').index
+        fact_trips = fact_trips.loc[order].assign(
+            pickup_datetime=pickup_datetime.loc[order],
+            pickup_location_type=fact_trips.loc[order, 'dim_pickup_location_key'].map(
+                dimensions['dim_pickup_location'].set_index('dim_pickup_location_key')['location_type']
+            )
+        )
+        months = fact_trips['pickup_datetime'].dt.strftime('%Y-%m').fillna('unknown')
+
+        fact_files = []
+        for month, month_index in months.groupby(months, sort=False).groups.items():
+            partition_dir = run_dir / 'fact_trips' / f'pickup_month={month}'
+            partition_dir.mkdir(parents=True, exist_ok=True)
+            month_facts = fact_trips.loc[month_index]
+            for part, start in enumerate(range(0, len(month_facts), self.rows_per_file)):
+                part_df = month_facts.iloc[start:start + self.rows_per_file]
+                part_path = partition_dir / f'part-{part:05d}.parquet'
+                part_df.to_parquet(part_path, index=False)
+                fact_files.append(self._zone_map(part_path.relative_to(run_dir), part_df))
+        return fact_files
+
+    def _zone_map(self, path, part_df):
+        zone_map = {'file': str(path), 'rows': len(part_df), 'min': {}, 'max': {}}
+        pickup_datetime = part_df['pickup_datetime']
+        if pickup_datetime.notna().any():
+            zone_map['min']['pickup_datetime'] = pickup_datetime.min().isoformat()
+            zone_map['max']['pickup_datetime'] = pickup_datetime.max().isoformat()
+        # the handful of location types is listed in full
+        zone_map['values'] = {'pickup_location_type': sorted(str(value) for value in part_df['pickup_location_type'].dropna().unique())}
+        for col in ZONE_MAP_COLUMNS:
+            if col in part_df.columns and part_df[col].notna().any():
+                zone_map['min'][col] = float(part_df[col].min())
+                zone_map['max'][col] = float(part_df[col].max())
+        return zone_map
+
+def read_manifest(output_path):
+    """Published manifest, or an empty one before the first run"""
+    manifest_path = Path(output_path) / MANIFEST_FILE
+    if not manifest_path.exists():
+        return {'run_id': None, 'fact_rows': 0, 'segments': []}
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
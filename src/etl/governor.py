@@ -0,0 +1,106 @@
+"""
+Memory budget governor for the ETL orchestrator.
+Measures bytes per row at each stage and sizes the next read chunk and the fact worker pool
+so the run stays under the configured memory budget as the schema or data mix changes.
+"""
+import re
+
+from ..utils.exceptions import ConfigurationError
+from ..utils.logger import get_logger
+
+SIZE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
+# share of the free budget a single chunk may use while it is read and transformed
+CHUNK_BUDGET_FRACTION = 0.25
+# interpreter, pandas and pyarrow footprint of one worker process
+WORKER_OVERHEAD_BYTES = 150 * 1024 ** 2
+
+def parse_size(value):
+    """Parses sizes such as 10MB, '4 GB' or a plain number of bytes"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMGT]?B)?\s*', str(value).upper())
+    if not match:
+        raise ConfigurationError(f'Invalid size {value!r}, expected e.g. 512MB or 8GB')
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2) or 'B'])
+
+class MemoryGovernor:
+    def __init__(self, memory_budget=None, initial_chunk_rows=10000, min_chunk_rows=1000, max_chunk_rows=2_000_000, smoothing=0.5):
+        self.logger = get_logger(__name__)
+        self.memory_budget = parse_size(memory_budget)
+        self.initial_chunk_rows = initial_chunk_rows
+        self.min_chunk_rows = min_chunk_rows
+        self.max_chunk_rows = max_chunk_rows
+        self.smoothing = smoothing
+        self.bytes_per_row = {}
+        self.resident_bytes = 0
+        self.peak_resident_bytes = 0
+        self.chunk_sizes = []
+        self.workers_chosen = None
+
+    def record(self, stage, total_bytes, rows):
+        """Records a memory_usage(deep=True) figure already computed for a stage"""
+        if not rows:
+            return
+        bytes_per_row = total_bytes / rows
+        previous = self.bytes_per_row.get(stage)
+        if previous is None:
+            self.bytes_per_row[stage] = bytes_per_row
+        else:
+            self.bytes_per_row[stage] = self.smoothing * bytes_per_row + (1 - self.smoothing) * previous
+
+    def observe(self, stage, df):
+        total_bytes = int(df.memory_usage(deep=True).sum())
+        self.record(stage, total_bytes, len(df))
+        return total_bytes
+
+    def hold(self, nbytes):
+        """Accounts for data kept alive for later stages"""
+        self.resident_bytes += nbytes
+        self.peak_resident_bytes = max(self.peak_resident_bytes, self.resident_bytes)
+        if self.memory_budget and self.resident_bytes > self.memory_budget:
+            self.logger.warning(f'Resident data {self.resident_bytes/1024/1024:.1f} MB exceeds the memory budget of {self.memory_budget/1024/1024:.1f} MB')
+
+    def release(self, nbytes):
+        self.resident_bytes = max(self.resident_bytes - nbytes, 0)
+
+    def available_bytes(self):
+        return max(self.memory_budget - self.resident_bytes, 0)
+
+    def chunk_rows(self):
+        rows = self.initial_chunk_rows
+        # a chunk is alive as raw text, as the processor's working copy and as the typed result at once
+        working_bytes_per_row = 2 * self.bytes_per_row.get('raw', 0) + self.bytes_per_row.get('typed', 0)
+        if self.memory_budget and working_bytes_per_row:
+            rows = int(self.available_bytes() * CHUNK_BUDGET_FRACTION / working_bytes_per_row)
+            rows = min(max(rows, self.min_chunk_rows), self.max_chunk_rows)
+            if self.chunk_sizes and rows != self.chunk_sizes[-1]:
+                self.logger.debug(f'Chunk size adjusted from {self.chunk_sizes[-1]} to {rows} rows ({working_bytes_per_row:.0f} bytes per row)')
+        self.chunk_sizes.append(rows)
+        return rows
+
+    def workers(self, num_rows, max_workers, shared_bytes=0, per_worker_bytes=0):
+        """
+        Largest worker count up to max_workers that fits the budget left after the resident data.
+        shared_bytes is data created for the workers once (e.g. the exchange copy of the trips), fact chunks
+        are counted twice (worker output and the parent's concat) and every worker adds its process overhead
+        plus per_worker_bytes (data every worker holds its own copy of, e.g. dimension lookups)
+        """
+        workers = max_workers
+        if self.memory_budget and max_workers > 1:
+            fact_bytes_per_row = self.bytes_per_row.get('facts', self.bytes_per_row.get('typed', 0))
+            free_bytes = self.available_bytes() - shared_bytes - num_rows * 2 * fact_bytes_per_row
+            workers = min(max_workers, max(int(free_bytes // (WORKER_OVERHEAD_BYTES + per_worker_bytes)), 1))
+            if workers < max_workers:
+                self.logger.warning(f'Memory budget allows {workers} of {max_workers} configured workers')
+        self.workers_chosen = workers
+        return workers
+
+    def summary(self):
+        return {
+            'memory_budget_mb': self.memory_budget / 1024 / 1024 if self.memory_budget else None,
+            'bytes_per_row': {stage: round(value, 1) for stage, value in self.bytes_per_row.items()},
+            'chunk_rows_min': min(self.chunk_sizes) if self.chunk_sizes else None,
+            'chunk_rows_max': max(self.chunk_sizes) if self.chunk_sizes else None,
+            'peak_resident_mb': round(self.peak_resident_bytes / 1024 / 1024, 2),
+            'workers': self.workers_chosen
+        }
@@ -3,7 +3,7 @@ ETL Orchestrator for Taxi ETL Dashboarding project.
 Coordinates the entire ETL pipeline with proper error handling and logging.
 """
 
-from ..config.settings import config
+from ..config.settings import Config, get_config
 
 from ..utils.exceptions import ConfigurationError
 from ..utils.exceptions import TaxiETLException
@@ -12,24 +12,37 @@ from ..utils.logger import LoggerFactory
 
 from ..data.reader import DataReader
 from ..data.processor import DataProcessor
+from ..data.deduplicator import TripDeduplicator
+from ..data.writer import StarSchemaWriter
+from ..data.exchange import ArrowExchange
+from ..data.statistics import DataProfile, DIMENSION_CARDINALITY_COLUMNS
+from .parallel import TRIPS_DATASET, create_facts_parallel, lookup_bytes, lookup_tables
+from .governor import MemoryGovernor
 
 from ..models.dimensions import DimensionCreator
 from ..models.facts import FactCreator
 
+import tempfile
 import time
+import pandas as pd
+import pyarrow as pa
 from pathlib import Path
 
+DATETIME_COLUMNS = ['tpep_pickup_datetime', 'tpep_dropoff_datetime']
+
 class ETLOrchestrator:
     def __init__(self, config_path = None):
-        if config_path:
+        if isinstance(config_path, Config):
             self.config = config_path
+        elif config_path:
+            self.config = Config(config_path)
         else:
-            self.config = config
-        
+            self.config = get_config()
+
         if not self.config.validate_required_config():
             raise ConfigurationError("Required Configuration is missing!")
-        
-        log_config = self.config.get_logging_config()
+
+        log_config = self.config.get_logging_config() or {}
         self.logger = LoggerFactory.create_logger(
             name=__name__,
             log_file=log_config.get('file'),
@@ -48,23 +61,247 @@ class ETLOrchestrator:
             'summary': {}
         }
 
-    def run_pipeline(self):
+    def run_pipeline(self, input_path=None, dry_run=False, sample_rows=None, sample_seed=None, stratified=None):
         self.logger.info('='*50)
         self.logger.info('Starting the Orchestrator process')
         self.logger.info('='*50)
 
         self.pipeline_state['start_time'] = time.time()
         self.pipeline_state['status'] = 'running'
+        sample = self._sampling_options(sample_rows, sample_seed, stratified)
+        if sample:
+            # a sample must not mark trips as seen or replace the published star schema
+            dry_run = True
+            self.logger.info(f'Sampling mode: {sample}')
+        stage_timings = {}
+        deduplicator = self._create_deduplicator(dry_run)
+        self.exchange = None
+        governor = MemoryGovernor(
+            memory_budget=self.config.get('data.memory_budget'),
+            initial_chunk_rows=self.config.get('data.batch_size', 10000)
+        )
 
         try:
-            self.logger.info('Step 1: Extracting data...')
-            df = self._extract_data()
+            self.logger.info('Steps 1-2: Extracting, transforming and deduplicating data in chunks...')
+            df, chunk_count, profile = self._extract_transform(input_path, deduplicator, governor, stage_timings, sample)
+
+            if len(df) == 0:
+                # every trip was already ingested, there is nothing to validate, model or publish
+                self.logger.warning('No new trips left after deduplication, nothing to load')
+                data_validation = fact_validation = None
+                dimensions, dimension_summary, fact_trips = {}, {}, df
+            else:
+                self.logger.info('Step 3: Validating data quality...')
+                data_validation = self._timed(stage_timings, 'validate', self._validate_data, df, profile)
+
+                self.logger.info('Step 4: Creating dimensions...')
+                dimensions = self._timed(stage_timings, 'dimensions', self.dimension_creator.create_all_dimensions, df)
+                dimension_summary = self.dimension_creator.get_dimension_summary(dimensions)
+                governor.hold(int(sum(dim['memory_mb'] for dim in dimension_summary.values()) * 1024 * 1024))
+
+                self.logger.info('Step 5: Creating fact table...')
+                fact_trips = self._timed(stage_timings, 'facts', self._create_facts, df, dimensions, governor)
+                governor.hold(governor.observe('facts', fact_trips))
+                fact_validation = self.fact_creator.validate_fact_table(fact_trips, dimensions)
+
+                if not dry_run and self.config.get('output.path'):
+                    self.logger.info('Step 6: Writing star schema...')
+                    self._timed(stage_timings, 'write', self._write_outputs, dimensions, fact_trips)
+
+            if deduplicator:
+                # a dry run (e.g. benchmarks) must not mark its trips as seen
+                if dry_run:
+                    deduplicator.rollback()
+                else:
+                    deduplicator.commit()
+
+            self.pipeline_state['status'] = 'completed'
+            self.pipeline_state['summary'] = {
+                'rows_processed': len(df),
+                'chunks': chunk_count,
+                'sample': sample,
+                'data_validation': data_validation,
+                'dimensions': dimension_summary,
+                'fact_validation': fact_validation,
+                'dedup': deduplicator.stats if deduplicator else None,
+                'memory': governor.summary(),
+                'stage_timings': stage_timings
+            }
+            self.pipeline_state['dimensions'] = dimensions
+            self.pipeline_state['fact_trips'] = fact_trips
+            return self.pipeline_state
 
         except Exception as e:
-            raise TaxiETLException
-    
-    def _extract_data(self):
+            if deduplicator:
+                deduplicator.rollback()
+            self.pipeline_state['status'] = 'failed'
+            self.pipeline_state['error'] = str(e)
+            error_msg = f'Pipeline failed: {e}'
+            self.logger.error(error_msg)
+            raise TaxiETLException(error_msg)
+
+        finally:
+            if self.exchange:
+                self.exchange.cleanup()
+            self.pipeline_state['end_time'] = time.time()
+            duration = self.pipeline_state['end_time'] - self.pipeline_state['start_time']
+            self.logger.info(f'Pipeline finished with status {self.pipeline_state["status"]} in {duration:.2f} seconds')
+
+    def _timed(self, stage_timings, stage, func, *args):
+        stage_start = time.perf_counter()
+        result = func(*args)
+        # chunked stages accumulate their time over all chunks
+        stage_timings[stage] = round(stage_timings.get(stage, 0) + time.perf_counter() - stage_start, 4)
+        return result
+
+    def _create_deduplicator(self, dry_run=False):
+        dedup_config = self.config.get('dedup', {})
+        if not dedup_config.get('enabled', False):
+            return None
+        return TripDeduplicator(
+            state_path=dedup_config.get('state_path', 'state/trip_filter.bin'),
+            expected_trips=dedup_config.get('expected_trips', 200_000_000),
+            false_positive_rate=dedup_config.get('false_positive_rate', 1e-4),
+            key_columns=dedup_config.get('key_columns'),
+            # dry, sampled and benchmark runs see the whole input, not only the trips missing from the history
+            check_history=not dry_run
+        )
+
+    def _sampling_options(self, sample_rows, sample_seed, stratified):
+        if not sample_rows:
+            return None
+        sampling_config = self.config.get('sampling', {})
+        if stratified is None:
+            stratified = sampling_config.get('method', 'stratified') == 'stratified'
+        return {
+            'sample_rows': sample_rows,
+            'seed': sampling_config.get('seed', 42) if sample_seed is None else sample_seed,
+            'strata': sampling_config.get('strata', []) if stratified else [],
+            'lines_per_seek': sampling_config.get('lines_per_seek', 1),
+            'oversample': sampling_config.get('oversample', 4)
+        }
+
+    def _extract_transform(self, input_path, deduplicator, governor, stage_timings, sample=None):
+        """Reads, types and deduplicates the input chunk by chunk, with chunk sizes chosen by the governor"""
+        data_config = self.config.get_data_config() or {}
+        input_path = Path(input_path or data_config['input_path'])
+        required_columns = self.config.get('validation.required_columns')
+        if sample:
+            # the sample is drawn by seeking into the full input and runs through the rest of the pipeline as one chunk
+            chunks = self._sample_chunks(input_path, required_columns, sample)
+        else:
+            chunks = self.data_reader.iter_csv_chunks(input_path, governor.chunk_rows, required_columns)
+        profile = self._new_profile()
+        spill = self._create_spill(governor)
+        typed_chunks, chunk_rows = [], []
+        held_bytes = 0
         try:
-            data_config = self.config.get_data_config()
-            input_path = Path(data_config['input_path'])
-        
+            while True:
+                chunk = self._timed(stage_timings, 'extract', next, chunks, None)
+                if chunk is None:
+                    break
+                chunk = self._timed(stage_timings, 'transform', self._transform_data, chunk, governor)
+                if deduplicator:
+                    chunk = self._timed(stage_timings, 'dedup', deduplicator.drop_duplicates, chunk)
+                self._timed(stage_timings, 'profile', self._profile_chunk, profile, chunk)
+                chunk_rows.append(len(chunk))
+                if spill:
+                    # typed chunks wait on disk, so the concat below is the only full-size copy in memory
+                    self._timed(stage_timings, 'spill', spill.put, f'typed_chunk_{len(chunk_rows):05d}', chunk)
+                else:
+                    chunk_bytes = int(governor.bytes_per_row.get('typed', 0) * len(chunk))
+                    governor.hold(chunk_bytes)
+                    held_bytes += chunk_bytes
+                    typed_chunks.append(chunk)
+
+            self.logger.info(f'Read {sum(chunk_rows)} rows from {input_path} in {len(chunk_rows)} chunks')
+            if spill:
+                df = self._timed(stage_timings, 'spill', self._concat_spilled, spill, len(chunk_rows))
+                governor.hold(int(governor.bytes_per_row.get('typed', 0) * len(df)))
+            else:
+                df = self._concat_chunks(typed_chunks)
+                # the concatenated frame is held while the chunks are still alive, then the chunks are freed
+                governor.hold(int(governor.bytes_per_row.get('typed', 0) * len(df)))
+                typed_chunks.clear()
+                governor.release(held_bytes)
+            return df, len(chunk_rows), profile
+        finally:
+            if spill:
+                spill.cleanup()
+
+    def _new_profile(self):
+        return DataProfile(self.config.get_validation_config(), cardinality_columns=DIMENSION_CARDINALITY_COLUMNS)
+
+    def _profile_chunk(self, profile, chunk):
+        # each chunk gets its own sketches, merged into the run profile instead of re-profiling the concatenated frame
+        return profile.merge(self._new_profile().update(chunk))
+
+    def _sample_chunks(self, input_path, required_columns, sample):
+        yield self.data_reader.sample_csv(input_path, required_columns=required_columns, **sample)
+
+    def _create_spill(self, governor):
+        if not governor.memory_budget:
+            return None
+        # on disk, spilling to the shared memory exchange root would not free any memory
+        return ArrowExchange(self.config.get('data.spill_path') or Path(tempfile.gettempdir()) / 'taxi_etl_spill')
+
+    def _concat_spilled(self, spill, chunk_count):
+        if not chunk_count:
+            raise TaxiETLException('Input contains no rows')
+        tables = [spill.get_table(f'typed_chunk_{part:05d}') for part in range(1, chunk_count + 1)]
+        try:
+            return pa.concat_tables(tables, promote_options='permissive').to_pandas(split_blocks=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            # chunks typed incompatibly (e.g. category and numeric) are reconciled by pandas, with both copies in memory
+            self.logger.warning(f'Spilled chunks have incompatible types ({e}), concatenating them in pandas')
+            return self._concat_chunks([table.to_pandas() for table in tables])
+
+    def _concat_chunks(self, chunks):
+        if not chunks:
+            raise TaxiETLException('Input contains no rows')
+        # categories are inferred per chunk, re-categorize after the concat turned mismatching ones into object
+        category_columns = {col for chunk in chunks for col in chunk.columns if isinstance(chunk[col].dtype, pd.CategoricalDtype)}
+        df = pd.concat(chunks, ignore_index=True)
+        for col in category_columns:
+            df[col] = df[col].astype('category')
+        return df
+
+    def _transform_data(self, df, governor=None):
+        if governor:
+            # measured as read, before any conversion, since chunk_rows() sizes chunks by their raw text
+            governor.observe('raw', df)
+        df = self.data_processor.convert_datetime_columns(df, DATETIME_COLUMNS)
+        if self.config.get('data.memory_optimization', False):
+            df = self.data_processor.optimize_data_types(df)
+            if governor:
+                usage = self.data_processor.last_memory_usage
+                governor.record('typed', usage['bytes_after'], usage['rows'])
+        elif governor:
+            governor.observe('typed', df)
+        return df
+
+    def _create_facts(self, df, dimensions, governor):
+        configured_workers = self.config.get('parallel.workers', 1) or 1
+        workers = governor.workers(
+            # the typed frame is already resident, only its exchange copy is new
+            len(df), configured_workers, shared_bytes=int(governor.bytes_per_row.get('typed', 0) * len(df)),
+            per_worker_bytes=lookup_bytes(dimensions) if configured_workers > 1 else 0
+        )
+        if workers <= 1 or len(df) < workers:
+            return self.fact_creator.create_fact_trips(df, dimensions)
+        # workers attach to memory-mapped Arrow IPC files instead of receiving pickled DataFrames
+        self.exchange = ArrowExchange(self.config.get('parallel.exchange_path'))
+        self.exchange.put(TRIPS_DATASET, df)
+        self.exchange.put_all(lookup_tables(dimensions))
+        self.logger.info(f'Creating fact table with {workers} workers via {self.exchange.path}')
+        return create_facts_parallel(self.exchange, list(dimensions), len(df), workers)
+
+    def _write_outputs(self, dimensions, fact_trips):
+        writer = StarSchemaWriter(self.config.get('output.path'), self.config.get('output.rows_per_file', 1_000_000))
+        return writer.write(dimensions, fact_trips)
+
+    def _validate_data(self, df, profile=None):
+        validation_results = self.data_processor.validate_data_quality(df, self.config.get_validation_config(), profile)
+        for warning in validation_results['warnings']:
+            self.logger.warning(warning)
+        return validation_results
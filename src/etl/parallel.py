@@ -0,0 +1,75 @@
+"""
+Parallel stages for the ETL orchestrator.
+Workers receive only the exchange directory and a row range, attach to the Arrow IPC files zero-copy,
+and publish their output back to the exchange for the parent to memory-map.
+Dimensions are published key-only (the lookup columns FactCreator maps through), and every worker keeps
+only the dimension rows its slice refers to, since the datetime and location dimensions have about one
+row per trip.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ..data.exchange import open_ipc_table, read_ipc, write_ipc
+from ..models.facts import FactCreator
+
+TRIPS_DATASET = 'typed_trips'
+
+# dimension -> (columns FactCreator looks keys up with, trips columns holding the looked up values)
+DIMENSION_LOOKUPS = {
+    'dim_vendor': (['dim_vendor_key', 'VendorID'], ['VendorID']),
+    'dim_datetime': (['dim_datetime_key', 'full_datetime'], ['tpep_pickup_datetime', 'tpep_dropoff_datetime']),
+    'dim_pickup_location': (['dim_pickup_location_key', 'pickup_latitude', 'pickup_longitude'], ['pickup_latitude']),
+    'dim_dropoff_location': (['dim_dropoff_location_key', 'dropoff_latitude', 'dropoff_longitude'], ['dropoff_latitude']),
+    'dim_ratecode': (['dim_ratecode_key', 'RatecodeID'], ['RatecodeID']),
+    'dim_payment_type': (['dim_payment_type_key', 'payment_type'], ['payment_type']),
+}
+
+def lookup_tables(dimensions):
+    """Key-only copies of the dimensions, all the fact stage needs"""
+    return {
+        name: dim_df[DIMENSION_LOOKUPS[name][0]] if name in DIMENSION_LOOKUPS else dim_df
+        for name, dim_df in dimensions.items()
+    }
+
+def lookup_bytes(dimensions):
+    """Upper bound of the dimension lookups one worker materializes, it only keeps the rows its slice refers to"""
+    return int(sum(dim_df.memory_usage(deep=True).sum() for dim_df in lookup_tables(dimensions).values()))
+
+def _slice_lookup(exchange_path, name, trips):
+    """Dimension rows the slice refers to, filtered on the memory-mapped table before anything is converted to pandas"""
+    table = open_ipc_table(exchange_path / f'{name}.arrow')
+    if name not in DIMENSION_LOOKUPS:
+        return table.to_pandas(split_blocks=True)
+    columns, trip_columns = DIMENSION_LOOKUPS[name]
+    lookup_column = table.column(columns[1])
+    values = pd.concat([trips[col] for col in trip_columns], ignore_index=True).unique()
+    # NaN becomes null on both sides, so trips with missing coordinates still find their dimension row
+    value_set = pa.array(np.asarray(values), from_pandas=True).cast(lookup_column.type)
+    return table.filter(pc.is_in(lookup_column, value_set=value_set, skip_nulls=False)).to_pandas(split_blocks=True)
+
+def _create_fact_chunk(exchange_path, dimension_names, start, stop, part):
+    exchange_path = Path(exchange_path)
+    trips = read_ipc(exchange_path / f'{TRIPS_DATASET}.arrow', start=start, stop=stop)
+    dimensions = {name: _slice_lookup(exchange_path, name, trips) for name in dimension_names}
+    fact_chunk = FactCreator().create_fact_trips(trips, dimensions)
+    # trip_id is positional, shift it to the global row number
+    fact_chunk['trip_id'] += start
+    return str(write_ipc(fact_chunk, exchange_path / f'fact_trips_part_{part:05d}.arrow'))
+
+def create_facts_parallel(exchange, dimension_names, num_rows, workers):
+    """Builds fact_trips from trips and dimensions already published to the exchange"""
+    chunk_rows = -(-num_rows // workers)
+    ranges = [(start, min(start + chunk_rows, num_rows)) for start in range(0, num_rows, chunk_rows)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_create_fact_chunk, str(exchange.path), list(dimension_names), start, stop, part)
+            for part, (start, stop) in enumerate(ranges)
+        ]
+        part_paths = [future.result() for future in futures]
+    tables = [open_ipc_table(path) for path in part_paths]
+    return pa.concat_tables(tables, promote_options='permissive').to_pandas(split_blocks=True)
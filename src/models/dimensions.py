@@ -73,7 +73,7 @@ class DimensionCreator:
     def _create_datetime_dimension(self, df):
         try:
             datetime_series = pd.concat([df['tpep_pickup_datetime'], df['tpep_dropoff_datetime']])
-            dim_datetime = pd.DateFrame({'full_datetime': datetime_series})
+            dim_datetime = pd.DataFrame({'full_datetime': datetime_series})
             dim_datetime = dim_datetime.drop_duplicates().reset_index(drop=True)
             dim_datetime.reset_index(names='dim_datetime_key', inplace=True)
             
@@ -91,6 +91,7 @@ class DimensionCreator:
             dim_datetime['month'] = dim_datetime['full_datetime'].dt.month
 
             self.logger.info(f'Dimension dim_datetime created: {dim_datetime.shape[0]} rows, {dim_datetime.shape[1]} columns')
+            return dim_datetime
 
         except Exception as e:
             error_msg = f"Error creating datetime dimension: {e}"
@@ -118,7 +119,7 @@ class DimensionCreator:
             )
             self.logger.info((f'Dimension dim_dropoff_location created: {dim_dropoff_location.shape[0]} rows, {dim_dropoff_location.shape[1]} columns'))
             return dim_dropoff_location
-        except:
+        except Exception as e:
             error_msg = f"Error creating dropoff location dimension: {e}"
             self.logger.error(error_msg)
             raise DimensionCreationError(error_msg)
@@ -154,7 +155,7 @@ class DimensionCreator:
     def _classify_location_type(self, row):
         try:
             lat, lon = row['pickup_latitude'], row['pickup_longitude']
-            if pd.isna(lat) or pd.isna(lon) or lat == 0 or lon == 0
+            if pd.isna(lat) or pd.isna(lon) or lat == 0 or lon == 0:
                 return 'Unknown'
             if -74.1 <= lon <= -73.7 and 40.5 <= lat <= 40.9:
                 if 40.75 <= lat <= 40.8 and -74.0 <= lon <= -73.9:
@@ -15,7 +15,8 @@ class FactCreator:
             fact_trips = self._add_measures(fact_trips, df)
             fact_trips = self._add_calculated_fields(fact_trips, df)
             fact_trips = self._add_degenerate_dimensions(fact_trips, df)
-        
+            return fact_trips
+
         except Exception as e:
             error_msg = f"Error creating fact table: {e}"
             print(error_msg)
@@ -95,7 +96,7 @@ class FactCreator:
     def _add_degenerate_dimensions(self, fact_trips, df):
         try:
             fact_trips['store_and_fwd_flag'] = df['store_and_fwd_flag']
-            fact_trips['is_airport_trip'] = df['RateCodeID'].isin([2,3,4])
+            fact_trips['is_airport_trip'] = df['RatecodeID'].isin([2,3,4])
             fact_trips['is_weekend_trip'] = df['tpep_pickup_datetime'].dt.weekday.isin([5,6])
             fact_trips['is_peak_hour'] = df['tpep_pickup_datetime'].dt.hour.isin([7,8,9,17,18,19])
             return fact_trips
@@ -0,0 +1,219 @@
+"""
+Local query service over the star schema written by StarSchemaWriter.
+Answers filtered aggregates over fact_trips joined to its dimensions, prunes fact files with the
+manifest zone maps and keeps an LRU cache of results that is cleared whenever a new run is published.
+Pickup time and location type are read from the fact files themselves; only the small vendor and
+payment type dimensions are loaded per segment, since every segment has its own dimension keys.
+"""
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..data.writer import MANIFEST_FILE, read_manifest
+from ..utils.exceptions import QueryError
+from ..utils.logger import get_logger
+
+MEASURES = {
+    'total_passengers': ('passenger_count', 'sum'),
+    'total_distance': ('trip_distance', 'sum'),
+    'total_fare': ('fare_amount', 'sum'),
+    'total_tips': ('tip_amount', 'sum'),
+    'total_amount': ('total_amount', 'sum'),
+    'avg_trip_duration_minutes': ('trip_duration_minutes', 'mean'),
+}
+
+# dimensions loaded per segment -> the columns filters and group by attributes need
+LOOKUP_DIMENSIONS = {
+    'dim_vendor': ['dim_vendor_key', 'VendorID', 'vendor_name'],
+    'dim_payment_type': ['dim_payment_type_key', 'payment_type', 'payment_type_description'],
+}
+
+# group by name -> (dimension, fact foreign key, dimension key, dimension attribute)
+DIMENSION_GROUP_BY = {
+    'vendor_name': ('dim_vendor', 'dim_vendor_key', 'dim_vendor_key', 'vendor_name'),
+    'payment_type_description': ('dim_payment_type', 'dim_payment_type_key', 'dim_payment_type_key', 'payment_type_description'),
+}
+
+# group by name -> (fact column, derivation)
+FACT_GROUP_BY = {
+    'pickup_location_type': ('pickup_location_type', lambda values: values),
+    'pickup_date': ('pickup_datetime', lambda values: values.dt.date),
+    'pickup_hour': ('pickup_datetime', lambda values: values.dt.hour),
+}
+
+GROUP_BY_ATTRIBUTES = {**DIMENSION_GROUP_BY, **FACT_GROUP_BY}
+
+class StarSchemaQueryService:
+    def __init__(self, output_path, cache_size=256):
+        self.logger = get_logger(__name__)
+        self.output_path = Path(output_path)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        self.manifest = None
+        # run_id -> LOOKUP_DIMENSIONS of that segment
+        self.segment_dimensions = {}
+        self._manifest_mtime = None
+
+    def _refresh(self):
+        """Reloads the manifest, loads the lookups of new segments and clears the cache when a new run has been published"""
+        manifest_path = self.output_path / MANIFEST_FILE
+        try:
+            mtime = manifest_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            raise QueryError(f'No star schema published at {self.output_path}, run the pipeline first')
+        if mtime == self._manifest_mtime:
+            return
+        manifest = read_manifest(self.output_path)
+        if self.manifest is None or manifest['run_id'] != self.manifest['run_id']:
+            segment_dimensions = {}
+            for segment in manifest['segments']:
+                dimensions = self.segment_dimensions.get(segment['run_id'])
+                if dimensions is None:
+                    run_dir = self.output_path / segment['run_dir']
+                    dimensions = {
+                        name: pd.read_parquet(run_dir / 'dimensions' / f'{name}.parquet', columns=columns)
+                        for name, columns in LOOKUP_DIMENSIONS.items()
+                    }
+                segment_dimensions[segment['run_id']] = dimensions
+            self.segment_dimensions = segment_dimensions
+            if self.manifest is not None:
+                self.cache_stats['invalidations'] += 1
+            self.cache.clear()
+            self.logger.info(f'Serving star schema up to run {manifest["run_id"]} ({len(manifest["segments"])} segments)')
+        self.manifest = manifest
+        self._manifest_mtime = mtime
+
+    def aggregate(self, start=None, end=None, vendor_ids=None, payment_types=None, location_types=None, group_by=None):
+        """
+        Aggregates trips with pickup time in [start, end), optionally restricted to VendorIDs, payment_type codes and
+        pickup location types, grouped by any of GROUP_BY_ATTRIBUTES. Returns a DataFrame with trip_count and MEASURES.
+        """
+        self._refresh()
+        group_by = tuple(group_by or ())
+        unknown = [g for g in group_by if g not in GROUP_BY_ATTRIBUTES]
+        if unknown:
+            raise QueryError(f'Unknown group by attributes: {unknown}')
+        cache_key = (
+            self.manifest['run_id'],
+            self._timestamp(start, 'start'),
+            self._timestamp(end, 'end'),
+            tuple(sorted(vendor_ids)) if vendor_ids else None,
+            tuple(sorted(payment_types)) if payment_types else None,
+            tuple(sorted(location_types)) if location_types else None,
+            group_by
+        )
+        if cache_key in self.cache:
+            self.cache.move_to_end(cache_key)
+            self.cache_stats['hits'] += 1
+            return self.cache[cache_key].copy()
+
+        self.cache_stats['misses'] += 1
+        result = self._execute(*cache_key[1:])
+        self.cache[cache_key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result.copy()
+
+    @staticmethod
+    def _timestamp(value, name):
+        if value is None:
+            return None
+        timestamp = pd.Timestamp(value)
+        if timestamp.tzinfo is not None:
+            # stored pickup times are naive local times, a UTC offset cannot be mapped onto them reliably
+            raise QueryError(f'{name}={value} has a timezone, pass a naive local timestamp like the pickup times')
+        return timestamp
+
+    def _execute(self, start, end, vendor_ids, payment_types, location_types, group_by):
+        frames = [
+            self._execute_segment(segment, self.segment_dimensions[segment['run_id']], start, end, vendor_ids, payment_types, location_types, group_by)
+            for segment in self.manifest['segments']
+        ]
+        frames = [frame for frame in frames if len(frame)]
+        facts = pd.concat(frames, ignore_index=True) if frames else None
+
+        if group_by:
+            if facts is None:
+                return pd.DataFrame(columns=list(group_by) + ['trip_count'] + list(MEASURES))
+            named_aggregations = {'trip_count': ('trip_id', 'size')}
+            named_aggregations.update(MEASURES)
+            return facts.groupby(list(group_by), dropna=False).agg(**named_aggregations).reset_index()
+        # an ungrouped query always returns one row, with trip_count 0 when nothing matched
+        row = {'trip_count': 0 if facts is None else len(facts)}
+        for name, (col, func) in MEASURES.items():
+            if facts is None:
+                row[name] = 0.0 if func == 'sum' else None
+            else:
+                row[name] = facts[col].agg(func)
+        return pd.DataFrame([row])
+
+    def _execute_segment(self, segment, dimensions, start, end, vendor_ids, payment_types, location_types, group_by):
+        """Matching fact rows of one segment, with the group by attributes resolved against its own dimensions"""
+        key_filters = {}
+        if vendor_ids:
+            key_filters['dim_vendor_key'] = self._dimension_keys(dimensions['dim_vendor'], 'dim_vendor_key', 'VendorID', vendor_ids)
+        if payment_types:
+            key_filters['dim_payment_type_key'] = self._dimension_keys(dimensions['dim_payment_type'], 'dim_payment_type_key', 'payment_type', payment_types)
+
+        files = [zone_map for zone_map in segment['fact_files'] if self._may_match(zone_map, start, end, key_filters, location_types)]
+        self.logger.debug(f'Zone maps pruned {len(segment["fact_files"]) - len(files)} of {len(segment["fact_files"])} fact files of run {segment["run_id"]}')
+
+        columns = {'trip_id'} | set(key_filters) | {col for col, _ in MEASURES.values()}
+        columns |= {DIMENSION_GROUP_BY[g][1] for g in group_by if g in DIMENSION_GROUP_BY}
+        columns |= {FACT_GROUP_BY[g][0] for g in group_by if g in FACT_GROUP_BY}
+        if start is not None or end is not None:
+            columns.add('pickup_datetime')
+        if location_types:
+            columns.add('pickup_location_type')
+        run_dir = self.output_path / segment['run_dir']
+        frames = []
+        for zone_map in files:
+            facts = pd.read_parquet(run_dir / zone_map['file'], columns=sorted(columns))
+            mask = np.ones(len(facts), dtype=bool)
+            for col, keys in key_filters.items():
+                mask &= facts[col].isin(keys).to_numpy()
+            if location_types:
+                mask &= facts['pickup_location_type'].isin(location_types).to_numpy()
+            if start is not None:
+                mask &= (facts['pickup_datetime'] >= start).to_numpy()
+            if end is not None:
+                mask &= (facts['pickup_datetime'] < end).to_numpy()
+            frames.append(facts[mask])
+        if not frames:
+            return pd.DataFrame()
+
+        facts = pd.concat(frames, ignore_index=True)
+        for g in group_by:
+            if g in DIMENSION_GROUP_BY:
+                dimension, fact_key, dim_key, attribute = DIMENSION_GROUP_BY[g]
+                facts[g] = facts[fact_key].map(dimensions[dimension].set_index(dim_key)[attribute])
+            else:
+                col, derive = FACT_GROUP_BY[g]
+                facts[g] = derive(facts[col])
+        return facts
+
+    @staticmethod
+    def _dimension_keys(dim_df, dim_key, attribute, values):
+        return np.sort(dim_df.loc[dim_df[attribute].isin(values), dim_key].to_numpy())
+
+    @staticmethod
+    def _may_match(zone_map, start, end, key_filters, location_types=None):
+        zone_min, zone_max = zone_map['min'], zone_map['max']
+        if 'pickup_datetime' in zone_min:
+            if start is not None and pd.Timestamp(zone_max['pickup_datetime']) < start:
+                return False
+            if end is not None and pd.Timestamp(zone_min['pickup_datetime']) >= end:
+                return False
+        if location_types and not set(location_types) & set(zone_map['values']['pickup_location_type']):
+            return False
+        for col, keys in key_filters.items():
+            if col not in zone_min:
+                continue
+            # first filter key >= the file minimum must not exceed the file maximum
+            position = np.searchsorted(keys, zone_min[col])
+            if position == len(keys) or keys[position] > zone_max[col]:
+                return False
+        return True
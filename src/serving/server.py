@@ -0,0 +1,56 @@
+"""
+Minimal HTTP front end for StarSchemaQueryService, for dashboards running on the same host.
+GET /aggregate?start=2016-03-01&end=2016-03-02&vendor=1&payment_type=1&location_type=Airport&group_by=vendor_name
+GET /stats
+"""
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from urllib.parse import parse_qs, urlparse
+
+from ..utils.exceptions import TaxiETLException
+from ..utils.logger import get_logger
+
+def create_server(query_service, host='127.0.0.1', port=8050):
+    logger = get_logger(__name__)
+    # the service cache is not thread safe, queries are served one at a time
+    query_lock = Lock()
+
+    class QueryHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            try:
+                if url.path == '/aggregate':
+                    with query_lock:
+                        result = query_service.aggregate(
+                            start=params.get('start', [None])[0],
+                            end=params.get('end', [None])[0],
+                            vendor_ids=[int(v) for v in params.get('vendor', [])],
+                            payment_types=[int(p) for p in params.get('payment_type', [])],
+                            location_types=params.get('location_type', []),
+                            group_by=params.get('group_by', [])
+                        )
+                    self._send(200, result.to_dict(orient='records'))
+                elif url.path == '/stats':
+                    self._send(200, {'run_id': (query_service.manifest or {}).get('run_id'), 'cache': query_service.cache_stats})
+                else:
+                    self._send(404, {'error': f'Unknown path {url.path}'})
+            except (TaxiETLException, ValueError) as e:
+                self._send(400, {'error': str(e)})
+            except Exception as e:
+                logger.error(f'Error serving {self.path}: {e}')
+                self._send(500, {'error': str(e)})
+
+        def _send(self, status, payload):
+            body = json.dumps(payload, default=str).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return ThreadingHTTPServer((host, port), QueryHandler)
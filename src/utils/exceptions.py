@@ -27,4 +27,10 @@ class FactCreationError(TaxiETLException):
     pass
 
 class ConfigurationError(TaxiETLException):
-    pass
\ No newline at end of file
+    pass
+
+class DeduplicationError(TaxiETLException):
+    pass
+
+class QueryError(TaxiETLException):
+    pass
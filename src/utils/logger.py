@@ -2,11 +2,10 @@ from pathlib import Path
 import logging
 import logging.handlers
 import sys
-import structlog
 
 class LoggerFactory:
     @staticmethod
-    def create_logger(name, log_file=None, level='DEBUG', max_bytes = 1024*1024*10, backup_count=5) -> logging.logger:
+    def create_logger(name, log_file=None, level='DEBUG', max_bytes = 1024*1024*10, backup_count=5) -> logging.Logger:
         logger = logging.getLogger(name)
         logger.setLevel(getattr(logging, level.upper()))
         formatter = logging.Formatter(
@@ -17,7 +16,7 @@ class LoggerFactory:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(getattr(logging, level.upper()))
         console_handler.setFormatter(formatter)
-        logging.addHandler(console_handler)
+        logger.addHandler(console_handler)
         if log_file:
             log_path = Path(log_file)
             log_path.parent.mkdir(parents=True, exist_ok=True)
@@ -31,6 +30,8 @@ class LoggerFactory:
     
     @staticmethod
     def create_structured_logger(name, log_file=None, level='DEBUG'):
+        # structlog is imported lazily so plain loggers (and quick CLI commands) don't pay for it
+        import structlog
         structlog.configure(
             processors=[
                 structlog.stdlib.filter_by_level,
@@ -59,5 +60,6 @@ def get_logger(name):
     return logging.getLogger(name)
 
 def get_structured_logger(name):
+    import structlog
     return structlog.get_logger(name)
 
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from src.data.deduplicator import DiskBloomFilter, SortedHashSet, TripDeduplicator
+
+KEY_COLUMNS = ['VendorID', 'tpep_pickup_datetime', 'fare_amount']
+
+
+def _trips(start, count):
+    return pd.DataFrame({
+        'VendorID': np.ones(count, dtype=int),
+        'tpep_pickup_datetime': pd.date_range('2024-01-01', periods=count, freq='min') + pd.Timedelta(minutes=start),
+        'fare_amount': np.full(count, 10.0)
+    })
+
+
+def _deduplicator(tmp_path, **kwargs):
+    return TripDeduplicator(tmp_path / 'filter.bin', expected_trips=10_000, false_positive_rate=1e-4, key_columns=KEY_COLUMNS, **kwargs)
+
+
+def test_bloom_filter_persists_and_keeps_false_positive_rate(tmp_path):
+    hashes = np.random.default_rng(0).integers(0, 2 ** 63, 10_000, dtype=np.uint64)
+    bloom = DiskBloomFilter(tmp_path / 'filter.bin', 10_000, 1e-3)
+    bloom.add(hashes)
+    bloom.close()
+
+    reopened = DiskBloomFilter(tmp_path / 'filter.bin', 10_000, 1e-3, read_only=True)
+    assert reopened.items_added == 10_000
+    assert reopened.contains(hashes).all()
+    others = np.random.default_rng(1).integers(0, 2 ** 63, 100_000, dtype=np.uint64)
+    assert reopened.contains(others).mean() < 3e-3
+
+
+def test_sorted_hash_set_is_exact():
+    hash_set = SortedHashSet()
+    for start in range(0, 1000, 100):
+        hash_set.add(np.arange(start, start + 100, dtype=np.uint64))
+    assert len(hash_set) == 1000
+    assert hash_set.contains(np.arange(1000, dtype=np.uint64)).all()
+    assert not hash_set.contains(np.arange(1000, 2000, dtype=np.uint64)).any()
+    assert len(hash_set.runs) <= 4
+
+
+def test_commit_persists_and_rollback_discards(tmp_path):
+    first = _deduplicator(tmp_path)
+    assert len(first.drop_duplicates(_trips(0, 50))) == 50
+    first.commit()
+
+    rolled_back = _deduplicator(tmp_path)
+    assert len(rolled_back.drop_duplicates(_trips(25, 50))) == 25
+    assert rolled_back.stats['duplicates_from_history'] == 25
+    rolled_back.rollback()
+
+    # the trips of the rolled back run are still new
+    again = _deduplicator(tmp_path)
+    assert len(again.drop_duplicates(_trips(25, 50))) == 25
+    again.commit()
+    assert DiskBloomFilter(tmp_path / 'filter.bin', 10_000, 1e-4, read_only=True).items_added == 75
+
+
+def test_repeats_across_chunks_count_as_in_run(tmp_path):
+    deduplicator = _deduplicator(tmp_path)
+    deduplicator.drop_duplicates(_trips(0, 30))
+    kept = deduplicator.drop_duplicates(pd.concat([_trips(20, 30), _trips(45, 1)], ignore_index=True))
+    assert len(kept) == 20
+    assert deduplicator.stats['duplicates_in_run'] == 11
+    assert deduplicator.stats['duplicates_from_history'] == 0
+
+
+def test_without_history_check_only_run_repeats_are_dropped(tmp_path):
+    first = _deduplicator(tmp_path)
+    first.drop_duplicates(_trips(0, 50))
+    first.commit()
+
+    dry = _deduplicator(tmp_path, check_history=False)
+    assert len(dry.drop_duplicates(pd.concat([_trips(0, 50), _trips(0, 10)], ignore_index=True))) == 50
+    assert dry.stats['duplicates_in_run'] == 10
+    dry.rollback()
+
+
+def test_capacity_and_size_mismatch_are_logged(tmp_path, caplog):
+    first = _deduplicator(tmp_path)
+    first.drop_duplicates(_trips(0, 50))
+    first.commit()
+    assert not [r for r in caplog.records if r.levelname == 'WARNING']
+
+    resized = TripDeduplicator(tmp_path / 'filter.bin', expected_trips=20, false_positive_rate=1e-4, key_columns=KEY_COLUMNS)
+    resized.drop_duplicates(_trips(100, 10))
+    warnings = [r.getMessage() for r in caplog.records if r.levelname == 'WARNING']
+    assert any('was built for 10000 trips' in message for message in warnings)
+
+    bloom = DiskBloomFilter(tmp_path / 'small.bin', 20, 1e-4)
+    bloom.add(np.arange(100, dtype=np.uint64))
+    bloom.close()
+    overfull = TripDeduplicator(tmp_path / 'small.bin', expected_trips=20, false_positive_rate=1e-4, key_columns=KEY_COLUMNS)
+    overfull.drop_duplicates(_trips(0, 10))
+    assert any('over its capacity of 20' in r.getMessage() for r in caplog.records)
+    assert bloom.estimated_false_positive_rate() > 1e-4
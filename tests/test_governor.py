@@ -0,0 +1,90 @@
+import pytest
+
+from src.etl.governor import CHUNK_BUDGET_FRACTION, WORKER_OVERHEAD_BYTES, MemoryGovernor, parse_size
+from src.utils.exceptions import ConfigurationError
+
+MB = 1024 ** 2
+
+
+def test_parse_size():
+    assert parse_size('512MB') == 512 * MB
+    assert parse_size(' 4 gb ') == 4 * 1024 ** 3
+    assert parse_size('1.5KB') == 1536
+    assert parse_size('2048') == 2048
+    assert parse_size(2048) == 2048
+    assert parse_size(None) is None
+    for value in ['lots', '5 PB', 'MB']:
+        with pytest.raises(ConfigurationError):
+            parse_size(value)
+
+
+def test_chunk_rows_without_budget_or_measurements_stays_initial():
+    governor = MemoryGovernor(initial_chunk_rows=5000)
+    governor.record('raw', 100 * 1000, 1000)
+    assert governor.chunk_rows() == 5000
+    # with a budget but nothing measured yet the first chunk is the initial size
+    assert MemoryGovernor('100MB', initial_chunk_rows=5000).chunk_rows() == 5000
+
+
+def test_chunk_rows_follow_bytes_per_row_and_free_budget():
+    governor = MemoryGovernor('100MB', smoothing=1.0)
+    governor.record('raw', 100 * 1000, 1000)
+    governor.record('typed', 50 * 1000, 1000)
+    # raw text twice plus the typed copy: 250 bytes per row
+    assert governor.chunk_rows() == int(100 * MB * CHUNK_BUDGET_FRACTION / 250)
+
+    # wider rows give smaller chunks
+    governor.record('raw', 200 * 1000, 1000)
+    assert governor.chunk_rows() == int(100 * MB * CHUNK_BUDGET_FRACTION / 450)
+
+    # resident data leaves less of the budget to the next chunk
+    governor.hold(50 * MB)
+    assert governor.chunk_rows() == int(50 * MB * CHUNK_BUDGET_FRACTION / 450)
+    governor.release(50 * MB)
+    assert governor.chunk_rows() == int(100 * MB * CHUNK_BUDGET_FRACTION / 450)
+
+
+def test_chunk_rows_are_clamped():
+    governor = MemoryGovernor('1MB', min_chunk_rows=1000, max_chunk_rows=50_000)
+    governor.record('raw', 1000 * 1000, 1000)
+    assert governor.chunk_rows() == 1000
+
+    governor = MemoryGovernor('10GB', min_chunk_rows=1000, max_chunk_rows=50_000)
+    governor.record('raw', 10 * 1000, 1000)
+    assert governor.chunk_rows() == 50_000
+    assert governor.summary()['chunk_rows_max'] == 50_000
+
+
+def test_release_keeps_peak_and_never_goes_negative():
+    governor = MemoryGovernor('100MB')
+    governor.hold(30 * MB)
+    governor.hold(20 * MB)
+    governor.release(40 * MB)
+    assert governor.resident_bytes == 10 * MB
+    governor.release(20 * MB)
+    assert governor.resident_bytes == 0
+    assert governor.peak_resident_bytes == 50 * MB
+    assert governor.available_bytes() == 100 * MB
+
+
+def test_workers_capped_by_budget():
+    per_worker_bytes = 10 * MB
+    budget = 3 * (WORKER_OVERHEAD_BYTES + per_worker_bytes) + 20 * MB
+    governor = MemoryGovernor(budget, smoothing=1.0)
+    governor.record('facts', 100 * 1000, 1000)
+    # shared data and the fact rows (worker output plus the parent's concat) come off the budget first
+    assert governor.workers(50_000, 8, shared_bytes=10 * MB, per_worker_bytes=per_worker_bytes) == 3
+    assert governor.workers_chosen == 3
+    assert governor.workers(50_000, 2, shared_bytes=10 * MB, per_worker_bytes=per_worker_bytes) == 2
+
+    # resident data shrinks the pool, down to a single worker but never below
+    governor.hold(2 * WORKER_OVERHEAD_BYTES)
+    assert governor.workers(50_000, 8, shared_bytes=10 * MB, per_worker_bytes=per_worker_bytes) == 1
+    governor.hold(budget)
+    assert governor.workers(50_000, 8) == 1
+
+
+def test_workers_uncapped_without_budget():
+    governor = MemoryGovernor()
+    governor.record('facts', 100 * 1000, 1000)
+    assert governor.workers(10 ** 8, 8, shared_bytes=10 ** 12, per_worker_bytes=10 ** 12) == 8
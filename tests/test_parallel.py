@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.exchange import ArrowExchange
+from src.data.processor import DataProcessor
+from src.etl.parallel import TRIPS_DATASET, _slice_lookup, create_facts_parallel, lookup_tables
+from src.models.dimensions import DimensionCreator
+from src.models.facts import FactCreator
+
+SAMPLE_PATH = Path(__file__).resolve().parent.parent / 'datasets' / 'taxi_data sample.csv'
+
+
+@pytest.fixture(scope='module')
+def trips():
+    df = pd.read_csv(SAMPLE_PATH)
+    # missing coordinates must map to their dimension row in the workers as well
+    df.loc[[3, 40], ['pickup_latitude', 'pickup_longitude']] = np.nan
+    processor = DataProcessor()
+    df = processor.convert_datetime_columns(df, ['tpep_pickup_datetime', 'tpep_dropoff_datetime'])
+    return processor.optimize_data_types(df)
+
+
+@pytest.fixture
+def exchange(tmp_path, trips):
+    exchange = ArrowExchange(tmp_path)
+    dimensions = DimensionCreator().create_all_dimensions(trips)
+    exchange.put(TRIPS_DATASET, trips)
+    exchange.put_all(lookup_tables(dimensions))
+    yield exchange, dimensions
+    exchange.cleanup()
+
+
+def test_parallel_facts_equal_sequential(trips, exchange):
+    exchange, dimensions = exchange
+    sequential = FactCreator().create_fact_trips(trips, dimensions)
+    parallel = create_facts_parallel(exchange, list(dimensions), len(trips), workers=3)
+    pd.testing.assert_frame_equal(parallel, sequential, check_dtype=False, check_categorical=False)
+
+
+def test_workers_only_materialize_their_slice(trips, exchange):
+    exchange, dimensions = exchange
+    trips_slice = trips.iloc[10:20]
+    dim_datetime = _slice_lookup(exchange.path, 'dim_datetime', trips_slice)
+    assert list(dim_datetime.columns) == ['dim_datetime_key', 'full_datetime']
+    expected = set(trips_slice['tpep_pickup_datetime']) | set(trips_slice['tpep_dropoff_datetime'])
+    assert set(dim_datetime['full_datetime']) == expected
+    assert len(_slice_lookup(exchange.path, 'dim_pickup_location', trips_slice)) <= len(trips_slice)
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from src.data.processor import DataProcessor
+from src.data.statistics import DataProfile
+
+RULES = {'min_passenger_count': 1, 'max_passenger_count': 6, 'min_trip_distance': 0.0, 'max_trip_distance': 100.0, 'min_fare_amount': 0.0}
+
+
+def _trips(rows=5000):
+    rng = np.random.default_rng(0)
+    pickup = pd.Series(pd.date_range('2016-03-01', periods=rows, freq='min'))
+    pickup[rng.choice(rows, 7, replace=False)] = pd.NaT
+    return pd.DataFrame({
+        'VendorID': rng.integers(1, 3, rows),
+        'tpep_pickup_datetime': pickup,
+        'tpep_dropoff_datetime': pickup + pd.Timedelta(minutes=10),
+        'passenger_count': rng.integers(0, 9, rows),
+        'trip_distance': rng.normal(5, 40, rows),
+        'fare_amount': rng.normal(10, 10, rows)
+    })
+
+
+def test_profile_warnings_match_frame_warnings():
+    df = _trips()
+    profile = DataProfile(RULES)
+    for start in range(0, len(df), 1000):
+        profile.merge(DataProfile(RULES).update(df.iloc[start:start + 1000]))
+
+    from_frame = DataProcessor().validate_data_quality(df, RULES)
+    from_profile = DataProcessor().validate_data_quality(df, RULES, profile)
+    assert from_frame['warnings'] == from_profile['warnings']
+    assert len(from_profile['warnings']) == 7
+    assert from_profile['summary']['chunks'] == 5
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.reader import DataReader
+
+STRATA = ['VendorID', 'pickup_month']
+
+
+@pytest.fixture(scope='module')
+def month_sorted_csv(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    rows = 60_000
+    months = np.repeat([1, 2, 3, 4], [12_000, 18_000, 24_000, 6_000])
+    pickup = pd.to_datetime([f'2016-{month:02d}-01' for month in months]) + pd.to_timedelta(rng.integers(0, 27 * 86400, rows), unit='s')
+    path = tmp_path_factory.mktemp('sampling') / 'trips.csv'
+    pd.DataFrame({
+        'VendorID': rng.choice([1, 2], rows, p=[0.3, 0.7]),
+        'tpep_pickup_datetime': pickup,
+        'fare_amount': rng.gamma(2, 7, rows).round(2)
+    }).to_csv(path, index=False)
+    return path
+
+
+def test_sample_is_reproducible(month_sorted_csv):
+    reader = DataReader()
+    first = reader.sample_csv(month_sorted_csv, 2000, seed=7, strata=STRATA)
+    second = reader.sample_csv(month_sorted_csv, 2000, seed=7, strata=STRATA)
+    other = reader.sample_csv(month_sorted_csv, 2000, seed=8, strata=STRATA)
+    pd.testing.assert_frame_equal(first, second)
+    assert not first.equals(other)
+
+
+def test_stratified_sample_follows_stratum_shares(month_sorted_csv):
+    sample = DataReader().sample_csv(month_sorted_csv, 2000, seed=3, strata=STRATA)
+    assert len(sample) == 2000
+    month_shares = sample['tpep_pickup_datetime'].str[:7].value_counts(normalize=True).sort_index().to_numpy()
+    np.testing.assert_allclose(month_shares, [0.2, 0.3, 0.4, 0.1], atol=0.03)
+    assert sample['VendorID'].value_counts(normalize=True)[2] == pytest.approx(0.7, abs=0.03)
+
+
+def test_small_file_is_returned_whole(tmp_path):
+    path = tmp_path / 'small.csv'
+    pd.DataFrame({'VendorID': [1, 2, 2], 'tpep_pickup_datetime': ['2016-03-01 00:00:00'] * 3}).to_csv(path, index=False)
+    assert len(DataReader().sample_csv(path, 10, strata=STRATA)) == 3
+
+
+def test_allocation_adds_up_to_sample_rows():
+    allocation = DataReader._allocate(10, {('a',): 5, ('b',): 5, ('c',): 5})
+    assert sum(allocation.values()) == 10
+    assert sorted(allocation.values()) == [3, 3, 4]
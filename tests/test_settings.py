@@ -0,0 +1,82 @@
+import pytest
+
+from src.config.settings import Config
+from src.utils.exceptions import ConfigurationError
+
+CONFIG_YAML = '''
+gcp:
+  project_id: "${TEST_GCP_PROJECT_ID}"
+  dataset_id: "${TEST_GCP_DATASET_ID}"
+data:
+  input_path: "${TEST_INPUT_PATH:-datasets/taxi_data.csv}"
+  batch_size: "${TEST_BATCH_SIZE:-10000}"
+  label: "trips-${TEST_LABEL:-2016}"
+  memory_budget: null
+validation:
+  max_trip_distance: "${TEST_MAX_TRIP_DISTANCE:-100.0}"
+dedup:
+  enabled: "${TEST_DEDUP_ENABLED:-true}"
+  key_columns:
+    - "VendorID"
+'''
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    for name in ['TEST_GCP_PROJECT_ID', 'TEST_GCP_DATASET_ID', 'TEST_INPUT_PATH', 'TEST_BATCH_SIZE', 'TEST_LABEL',
+                 'TEST_MAX_TRIP_DISTANCE', 'TEST_DEDUP_ENABLED']:
+        monkeypatch.delenv(name, raising=False)
+    path = tmp_path / 'config.yaml'
+    path.write_text(CONFIG_YAML)
+    return path
+
+
+def test_placeholder_defaults_keep_their_type(config_path):
+    config = Config(config_path)
+    assert config.get('data.input_path') == 'datasets/taxi_data.csv'
+    assert config.get('data.batch_size') == 10000
+    assert config.get('validation.max_trip_distance') == 100.0
+    assert config.get('dedup.enabled') is True
+    assert config.get('data.label') == 'trips-2016'
+    assert config.get('gcp.project_id') is None
+
+
+def test_placeholders_take_env_values(config_path, monkeypatch):
+    monkeypatch.setenv('TEST_BATCH_SIZE', '77')
+    monkeypatch.setenv('TEST_MAX_TRIP_DISTANCE', '50')
+    monkeypatch.setenv('TEST_DEDUP_ENABLED', 'no')
+    monkeypatch.setenv('TEST_LABEL', '2017')
+    config = Config(config_path)
+    assert config.get('data.batch_size') == 77
+    assert config.get('validation.max_trip_distance') == 50.0
+    assert config.get('dedup.enabled') is False
+    assert config.get('data.label') == 'trips-2017'
+
+
+def test_string_placeholders_are_not_yaml_typed(config_path, monkeypatch):
+    monkeypatch.setenv('TEST_GCP_DATASET_ID', '0123')
+    monkeypatch.setenv('TEST_GCP_PROJECT_ID', 'on')
+    config = Config(config_path)
+    assert config.get('gcp.dataset_id') == '0123'
+    assert config.get('gcp.project_id') == 'on'
+
+
+def test_invalid_numeric_value_is_rejected(config_path, monkeypatch):
+    monkeypatch.setenv('TEST_BATCH_SIZE', 'many')
+    with pytest.raises(ConfigurationError):
+        Config(config_path)
+
+
+def test_prefixed_env_overrides_nested_keys(config_path, monkeypatch):
+    monkeypatch.setenv('TAXI_ETL__DATA__BATCH_SIZE', '500')
+    monkeypatch.setenv('TAXI_ETL__DATA__MEMORY_BUDGET', '8GB')
+    monkeypatch.setenv('TAXI_ETL__GCP__DATASET_ID', '0123')
+    monkeypatch.setenv('TAXI_ETL__DEDUP__KEY_COLUMNS', '[VendorID, fare_amount]')
+    monkeypatch.setenv('TAXI_ETL__SERVING__PORT', '9000')
+    config = Config(config_path)
+    assert config.get('data.batch_size') == 500
+    assert config.get('data.memory_budget') == '8GB'
+    assert config.get('gcp.dataset_id') == '0123'
+    assert config.get('dedup.key_columns') == ['VendorID', 'fare_amount']
+    # keys missing from the YAML are added as strings
+    assert config.get('serving.port') == '9000'
@@ -0,0 +1,126 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.data.processor import DataProcessor
+from src.data.writer import StarSchemaWriter, read_manifest
+from src.models.dimensions import DimensionCreator
+from src.models.facts import FactCreator
+from src.serving.query_service import StarSchemaQueryService
+from src.utils.exceptions import QueryError
+
+SAMPLE_PATH = Path(__file__).resolve().parent.parent / 'datasets' / 'taxi_data sample.csv'
+
+
+@pytest.fixture(scope='module')
+def trips():
+    df = pd.read_csv(SAMPLE_PATH)
+    return DataProcessor().convert_datetime_columns(df, ['tpep_pickup_datetime', 'tpep_dropoff_datetime'])
+
+
+def _publish(output_path, trips, rows_per_file=10):
+    dimensions = DimensionCreator().create_all_dimensions(trips)
+    fact_trips = FactCreator().create_fact_trips(trips, dimensions)
+    return StarSchemaWriter(output_path, rows_per_file).write(dimensions, fact_trips)
+
+
+@pytest.fixture
+def two_segments(tmp_path, trips):
+    # each run numbers its dimension keys from zero, so the same key means different values per segment
+    _publish(tmp_path, trips.iloc[:60].reset_index(drop=True))
+    _publish(tmp_path, trips.iloc[60:].reset_index(drop=True))
+    return tmp_path
+
+
+def test_runs_are_appended_as_segments(two_segments, trips):
+    manifest = read_manifest(two_segments)
+    assert len(manifest['segments']) == 2
+    assert manifest['fact_rows'] == len(trips)
+    assert manifest['run_id'] == manifest['segments'][-1]['run_id']
+    assert all((two_segments / seg['run_dir']).is_dir() for seg in manifest['segments'])
+
+
+def test_empty_fact_table_is_not_published(tmp_path, trips):
+    dimensions = DimensionCreator().create_all_dimensions(trips)
+    assert StarSchemaWriter(tmp_path).write(dimensions, FactCreator().create_fact_trips(trips, dimensions).iloc[:0]) is None
+    assert read_manifest(tmp_path)['segments'] == []
+
+
+def test_aggregates_span_segments(two_segments, trips):
+    service = StarSchemaQueryService(two_segments)
+    total = service.aggregate()
+    assert total['trip_count'][0] == len(trips)
+    assert total['total_fare'][0] == pytest.approx(trips['fare_amount'].sum())
+
+    by_vendor = service.aggregate(group_by=['vendor_name']).set_index('vendor_name')['trip_count']
+    assert sorted(by_vendor.tolist()) == sorted(trips['VendorID'].value_counts().tolist())
+
+    # keys are resolved against each segment's own dim_vendor
+    vendor_two = service.aggregate(vendor_ids=[2])
+    assert vendor_two['trip_count'][0] == (trips['VendorID'] == 2).sum()
+    assert vendor_two['total_fare'][0] == pytest.approx(trips.loc[trips['VendorID'] == 2, 'fare_amount'].sum())
+
+
+def test_time_and_location_filters(two_segments, trips):
+    service = StarSchemaQueryService(two_segments)
+    start, end = trips['tpep_pickup_datetime'].quantile(0.25), trips['tpep_pickup_datetime'].quantile(0.75)
+    expected = ((trips['tpep_pickup_datetime'] >= start) & (trips['tpep_pickup_datetime'] < end)).sum()
+    assert service.aggregate(start=start, end=end)['trip_count'][0] == expected
+
+    by_location = service.aggregate(group_by=['pickup_location_type'])
+    location_type = by_location['pickup_location_type'][0]
+    assert service.aggregate(location_types=[location_type])['trip_count'][0] == by_location['trip_count'][0]
+    assert service.aggregate(group_by=['pickup_hour'])['trip_count'].sum() == len(trips)
+
+
+def test_empty_ungrouped_query_returns_zero_row(two_segments):
+    service = StarSchemaQueryService(two_segments)
+    result = service.aggregate(start='2030-01-01')
+    assert len(result) == 1
+    assert result['trip_count'][0] == 0
+    assert result['total_fare'][0] == 0
+    assert service.aggregate(start='2030-01-01', group_by=['vendor_name']).empty
+
+
+def test_timezone_aware_bounds_are_rejected(two_segments):
+    with pytest.raises(QueryError):
+        StarSchemaQueryService(two_segments).aggregate(start='2016-03-01T00:00:00Z')
+
+
+def test_zone_maps_prune_files():
+    zone_map = {
+        'min': {'pickup_datetime': '2016-03-01T00:00:00', 'dim_vendor_key': 0.0},
+        'max': {'pickup_datetime': '2016-03-01T00:10:00', 'dim_vendor_key': 1.0},
+        'values': {'pickup_location_type': ['Manhattan']}
+    }
+    may_match = StarSchemaQueryService._may_match
+    assert may_match(zone_map, pd.Timestamp('2016-03-01 00:05'), None, {})
+    assert not may_match(zone_map, pd.Timestamp('2016-03-01 00:10:01'), None, {})
+    assert not may_match(zone_map, None, pd.Timestamp('2016-03-01'), {})
+    assert may_match(zone_map, None, None, {'dim_vendor_key': [1, 5]})
+    assert not may_match(zone_map, None, None, {'dim_vendor_key': [2, 5]})
+    assert not may_match(zone_map, None, None, {}, ['Airport'])
+
+
+def test_cache_evicts_least_recently_used(two_segments):
+    service = StarSchemaQueryService(two_segments, cache_size=2)
+    service.aggregate(vendor_ids=[1])
+    service.aggregate(vendor_ids=[2])
+    service.aggregate(vendor_ids=[1])
+    service.aggregate(payment_types=[1])
+    assert len(service.cache) == 2
+    assert service.cache_stats == {'hits': 1, 'misses': 3, 'invalidations': 0}
+    # vendor 2 was the least recently used entry
+    service.aggregate(vendor_ids=[2])
+    assert service.cache_stats['misses'] == 4
+
+
+def test_cache_is_cleared_when_a_run_is_published(tmp_path, trips):
+    _publish(tmp_path, trips.iloc[:60].reset_index(drop=True))
+    service = StarSchemaQueryService(tmp_path)
+    assert service.aggregate()['trip_count'][0] == 60
+    _publish(tmp_path, trips.iloc[60:].reset_index(drop=True))
+    assert service.aggregate()['trip_count'][0] == len(trips)
+    assert service.cache_stats['invalidations'] == 1
+    assert len(service.segment_dimensions) == 2
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.statistics import DataProfile, HyperLogLog, KLLSketch
+
+
+def _chunks(data, parts):
+    bounds = np.linspace(0, len(data), parts + 1).astype(int)
+    return [data.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def test_hyperloglog_error_bound():
+    values = pd.Series(np.arange(200_000))
+    estimate = HyperLogLog(precision=14).update(values).count()
+    # 1.04/sqrt(2**14) is about 0.8%, allow four standard errors
+    assert abs(estimate - 200_000) / 200_000 < 0.033
+
+
+def test_hyperloglog_merge_equals_single_pass():
+    values = pd.Series(np.random.default_rng(0).integers(0, 50_000, 300_000))
+    merged = HyperLogLog()
+    for chunk in _chunks(values, 7):
+        merged.merge(HyperLogLog().update(chunk))
+    assert np.array_equal(merged.registers, HyperLogLog().update(values).registers)
+
+
+def test_hyperloglog_rejects_mismatched_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
+
+
+def test_kll_rank_error_bound():
+    values = np.random.default_rng(1).normal(size=200_000)
+    sketch = KLLSketch(k=200, seed=1).update(values)
+    ordered = np.sort(values)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        rank = np.searchsorted(ordered, sketch.quantile(q)) / len(values)
+        assert abs(rank - q) < 0.02
+
+
+def test_kll_merge_keeps_count_and_extremes():
+    values = np.random.default_rng(2).exponential(size=100_000)
+    merged = KLLSketch(seed=2)
+    for chunk in np.array_split(values, 10):
+        merged.merge(KLLSketch(seed=2).update(chunk))
+    assert merged.count == len(values)
+    assert merged.quantile(0) == values.min()
+    assert merged.quantile(1) == values.max()
+    rank = np.searchsorted(np.sort(values), merged.quantile(0.5)) / len(values)
+    assert abs(rank - 0.5) < 0.02
+
+
+def test_profile_merge_matches_single_pass():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        'VendorID': rng.integers(1, 3, 10_000),
+        'passenger_count': rng.integers(0, 7, 10_000).astype(float),
+        'fare_amount': rng.normal(15, 10, 10_000),
+        'note': rng.choice(['a', 'b', None], 10_000)
+    })
+    rules = {'min_passenger_count': 1, 'min_fare_amount': 0}
+    single = DataProfile(rules, cardinality_columns=['VendorID', 'passenger_count']).update(df).to_dict()
+    merged = DataProfile(rules, cardinality_columns=['VendorID', 'passenger_count'])
+    for chunk in _chunks(df, 4):
+        merged.merge(DataProfile(rules, cardinality_columns=['VendorID', 'passenger_count']).update(chunk))
+    merged = merged.to_dict()
+
+    for key in ('total_rows', 'total_columns', 'null_counts', 'violation_counts', 'approx_distinct'):
+        assert merged[key] == single[key]
+    assert merged['chunks'] == 4
+    assert set(merged['approx_distinct']) == {'VendorID', 'passenger_count'}